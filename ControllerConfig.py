@@ -1,3 +1,7 @@
+from handhistory import HandHistory
+from handsnapshot import HandExtractor
+
+
 class ControllerConfig(object):
     def __init__(self, name, behavior_func):
         self.name = name
@@ -10,10 +14,13 @@ class ConfigurationManager(object):
     def __init__(self):
         self.configs = {}
         self.selected_config = None
+        self.extractor = HandExtractor()
+        self.history = HandHistory()
 
     def add_config(self, config):
         if config.name in self.configs:
             raise ValueError("Configuration with name '{}' already exists.".format(config.name))
+        config.history = self.history
         self.configs[config.name] = config
 
     def select_config(self, name):
@@ -22,7 +29,45 @@ class ConfigurationManager(object):
         
         self.selected_config = self.configs[name]
 
-    def execute_selected_behavior(self, frame):
+    def recalibrate(self):
+        """Forget the hand history and every behavior's filter state."""
+        self.history.clear()
+        for config in self.configs.values():
+            smoothing = getattr(config, "smoothing", None)
+            if smoothing:
+                smoothing.reset()
+
+    def capture(self, frame):
+        """Take hand snapshots of a Leap frame. Safe to call on the SDK callback thread.
+
+        Returns:
+        - HandFrame: Snapshots to pass to record and run_selected_behavior.
+        """
+        # Behaviors run against per-frame hand snapshots instead of the SWIG objects
+        return self.extractor.extract(frame)
+
+    def record(self, hands):
+        """Add hand snapshots to the shared history.
+
+        The history hands out views of its ring buffer, so it must only be written on the thread
+        that reads it: the one running the behaviors, recalibrate and the shape recognizer.
+        """
+        self.history.append(hands)
+
+    def run_selected_behavior(self, hands):
         if self.selected_config:
-            self.selected_config.execute(frame)
+            # Behaviors can ask for smoothed hands, the history keeps the raw values
+            smoothing = getattr(self.selected_config, "smoothing", None)
+            if smoothing:
+                hands = smoothing.apply(hands)
+            # Predict past the smoothing lag as well as the SDK and output latency
+            prediction = getattr(self.selected_config, "prediction", None)
+            if prediction:
+                hands = prediction.apply(hands, self.history, smoothing.latency if smoothing else 0.0)
+            self.selected_config.execute(hands)
 
+    def execute_selected_behavior(self, frame):
+        if self.selected_config:
+            hands = self.capture(frame)
+            self.record(hands)
+            self.run_selected_behavior(hands)
@@ -10,25 +10,34 @@ Configuration:
 '''
 
 import sys
-
+import argparse
+import collections
 
 
 from ControllerConfig import ConfigurationManager
-from behaviors import HandSlideBehavior, HandTiltBehavior
-
-
-
-import Leap
+from behaviors import BaseBehavior, HandSlideBehavior, HandTiltBehavior, TwoHandBehavior
+from focus import default_provider
+from gestures import GestureDispatcher
+from governor import IdleGovernor
+from hotkeys import HotkeyListener
+from pipeline import FrameWorker
+from prediction import PosePredictor
+from recording import FramePlayer, FrameRecorder, ReplayController
+from shapes import ShapeRecognizer
+
+
+
+try:
+    import Leap
+except ImportError:
+    import LeapEmulation as Leap  # No native SDK available, e.g. on Linux CI
 import time 
-import win32gui
 
 
 
 
 #import pyautogui
 
-from Leap import CircleGesture, KeyTapGesture, ScreenTapGesture, SwipeGesture
-
 class LeapMotionListener(Leap.Listener):
     finger_names = ['Thumb', 'Index', 'Middle', 'Ring', 'Pinky' ]
     
@@ -41,6 +50,10 @@ class LeapMotionListener(Leap.Listener):
     state_names = ['STATE_INVALID', 'STATE_START', 'STATE_UPDATE', 'STATE_END']
 
     config_manager = ConfigurationManager()
+    recorder = None  # Optional FrameRecorder, set from main()
+    prediction_latency = None  # Seconds to extrapolate hands ahead, None disables prediction
+    synchronous = False  # Process every frame on the callback thread, set for replay
+    clock = None  # Frame clock for timers and the idle governor during replay, None uses the monotonic clock
 
     def on_init(self, controller):
         print("Initialized")
@@ -51,16 +64,51 @@ class LeapMotionListener(Leap.Listener):
         self.config_manager = ConfigurationManager()
         hand_tilt = HandTiltBehavior()
         hand_slide = HandSlideBehavior()
+        two_hand = TwoHandBehavior()
         self.config_manager.add_config(hand_tilt)
         self.config_manager.add_config(hand_slide)
+        self.config_manager.add_config(two_hand)
         self.config_manager.select_config("handSlide")
 
+        # Optionally act on where the hand will be once Google Earth reacts
+        if self.prediction_latency is not None:
+            for config in self.config_manager.configs.values():
+                config.prediction = PosePredictor(latency=self.prediction_latency)
+
+        # Watch the Google Earth UI so behaviors can stop waiting as soon as a change shows up.
+        # Not during replay, the screen then has nothing to do with the recording.
+        if not self.clock:
+            BaseBehavior.ui_state.start()
+
+        # Behaviors run on their own thread, on_frame only hands over the newest snapshot.
+        # Replay processes every frame in order instead, so runs are repeatable.
+        self.worker = FrameWorker(self.process_frame, name="BehaviorWorker", inline=self.synchronous)
+        self.worker.start()
+
+        # Replay runs everything time-based on the recorded frame times, so results do not depend on playback speed
+        if self.clock:
+            BaseBehavior.timers.set_clock(self.clock, threaded=False)
+            BaseBehavior.macros.inline = True
+
+        # Drops to a low processing rate while nobody is at the kiosk
+        self.governor = IdleGovernor(clock=self.clock) if self.clock else IdleGovernor()
+
+        # Operator hotkeys and sensor gestures queue commands for the worker instead of being polled every frame
+        self.commands = collections.deque()
+        # Timer callbacks change planet and idle state, so they run on the worker as well
+        BaseBehavior.timers.post = lambda callback: self.commands.append(("timer", callback))
+        self.hotkeys = HotkeyListener(commands=self.commands)
+        self.hotkeys.start()
+        self.gestures = GestureDispatcher(self.commands)
+        # Shapes drawn with the palm, matched against built-in and learned templates
+        self.shapes = ShapeRecognizer.load(commands=self.commands)
 
 
     def on_connect(self, controller):
         print ("Motion Sensor Connected!")
 
         controller.enable_gesture(Leap.Gesture.TYPE_SWIPE);
+        controller.enable_gesture(Leap.Gesture.TYPE_CIRCLE)
         
         
         
@@ -69,27 +117,157 @@ class LeapMotionListener(Leap.Listener):
         print("Motion Sensor Disconnected")
 
     def on_exit(self, controller):
+        self.hotkeys.stop()
+        self.worker.stop()
+        print("Frames processed: {}, stale frames dropped: {}".format(self.worker.processed, self.worker.mailbox.dropped))
+        print("Focus checks: {} cached, {} system calls".format(focus_provider.hits, focus_provider.misses))
+        print("Gestures: {} completed, {} dispatched".format(self.gestures.completed, self.gestures.dispatched))
+        print("Shapes: {} matched".format(self.shapes.matches))
+        print(self.governor.report())
+        print("Zoom: {} wheel events, {} notches for {} frame deltas".format(
+            BaseBehavior.wheel.events, BaseBehavior.wheel.notches, BaseBehavior.wheel.deltas))
+        zones = self.config_manager.configs["handSlide"].zones
+        print("Slide zones: {} key events, {} prevented by hysteresis and dwell".format(zones.key_events, zones.prevented))
+        smoothing = self.config_manager.selected_config.smoothing
+        if smoothing:
+            print("Smoothing latency: {:.1f} ms palm, {:.1f} ms orientation (last frame), {:.1f} ms palm average".format(
+                smoothing.latency * 1e3, smoothing.orientation_latency * 1e3, smoothing.mean_latency * 1e3))
+        prediction = self.config_manager.selected_config.prediction
+        if prediction:
+            print("Prediction: {:.0f} ms ahead, {:.1f} mm average lead, {} leads capped, {} held back".format(
+                prediction.horizon * 1e3, prediction.mean_lead, prediction.clamped, prediction.held_back))
+        BaseBehavior.actuator.stop()
+        BaseBehavior.macros.stop()
+        BaseBehavior.timers.stop()
+        BaseBehavior.street_view.stop()
+        BaseBehavior.ui_state.stop()
         print("Exited")
     
     def on_frame(self, controller):
 
         frame = controller.frame()
 
-        if(is_google_earth_active()):
+        if self.recorder:
+            self.recorder.record(frame)
+
+        if self.clock:
+            BaseBehavior.timers.advance()
+
+        prediction = self.config_manager.selected_config.prediction
+        if prediction:
+            prediction.observe_latency((controller.now() - frame.timestamp) * 1e-6)
+
+        # Cheap presence check first, idle frames without hands skip extraction and the behaviors
+        if not self.governor.admit(not frame.hands.is_empty):
+            return
+
+        # Gestures since the last admitted frame, so skipped frames are caught up on
+        self.gestures.process(frame)
+
+        self.worker.post(self.config_manager.capture(frame))
+
+    def process_frame(self, hands):
+        """Runs on the worker thread with the freshest hand snapshot."""
+        self.config_manager.record(hands)
+        active = is_google_earth_active()
+        # Timer callbacks run from the command queue below and must not send input to another window
+        BaseBehavior.google_earth_active = active
+        controller_id = self.config_manager.selected_config.tracker.controller_id if hands.hands else None
+        # A circle the sensor reports as a gesture is routed from there, not matched as a palm shape as well
+        if self.gestures.last_circle is not None:
+            self.shapes.skip_until(self.gestures.last_circle)
+        self.shapes.update(self.config_manager.history, controller_id)
+        while self.commands:
+            self.run_command(self.commands.popleft(), active)
+
+        if(active):
             # Execute the behavior using the frame data
-            self.config_manager.execute_selected_behavior(frame)
+            self.config_manager.run_selected_behavior(hands)
+
+    def run_command(self, command, active):
+        """Carry out a hotkey or gesture command, see hotkeys.py."""
+        behavior = self.config_manager.selected_config
+        if command[0] in ("planet", "rotate", "home"):
+            # Only while Google Earth is in front and no other operator macro is typing into it.
+            # Automatic navigation does not block these, the operator macro preempts it.
+            priority = BaseBehavior.operator_priority
+            if active and not BaseBehavior.macros.busy_at(priority) and not BaseBehavior.exitingStreetView:
+                if command[0] == "home":
+                    print("Moving to Arizona Science Center")
+                    behavior.navigate_to("Arizona Science Center", priority)
+                else:
+                    # Rotate has the same cooldown as a planet hotkey, so a repeated gesture does not queue switch after switch
+                    target = behavior.next_planet() if command[0] == "rotate" else command[1]
+                    if behavior.switch_planets(target):
+                        print("Moving to " + target)
+        elif command[0] == "behavior":
+            names = sorted(self.config_manager.configs)
+            name = names[(names.index(behavior.name) + 1) % len(names)]
+            behavior.deselect()
+            self.config_manager.select_config(name)
+            print("Behavior: " + name)
+        elif command[0] == "recalibrate":
+            behavior.relase_keys()
+            BaseBehavior.wheel.reset()
+            self.config_manager.recalibrate()
+            print("Recalibrated")
+        elif command[0] == "record":
+            self.toggle_recording()
+        elif command[0] == "timer":
+            command[1]()
+
+    def toggle_recording(self):
+        recorder, self.recorder = self.recorder, None
+        if recorder:
+            recorder.stop()
+            print("Recording stopped")
+        else:
+            path = time.strftime("session-%Y%m%d-%H%M%S.leaprec")
+            recorder = FrameRecorder(path)
+            recorder.start()
+            self.recorder = recorder
+            print("Recording frames to " + path)
+
+
+# Foreground window title, cached for a short time instead of queried on every frame
+focus_provider = default_provider()
 
 
 def is_google_earth_active():
     """Check if the active window is Google Earth."""
-    window_title = win32gui.GetWindowText(win32gui.GetForegroundWindow())
-    return "Google Earth Pro" in window_title
+    return focus_provider.is_active("Google Earth Pro")
+
+
+def replay(path, speed=1.0, predict_ms=None):
+    """Feed a recorded session through the listener instead of the sensor."""
+    listener = LeapMotionListener()
+    listener.synchronous = True
+    if predict_ms is not None:
+        listener.prediction_latency = predict_ms / 1000.0
+    controller = ReplayController()
+    listener.clock = controller.clock
+    player = FramePlayer(path)
+    print("Replaying {} frames ({:.1f} s) from {}".format(len(player), player.duration, path))
+    try:
+        player.play(listener, controller, speed=speed)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        player.close()
 
 
-def main():
+def main(record_path=None, predict_ms=None):
     listener = LeapMotionListener()
+    if predict_ms is not None:
+        listener.prediction_latency = predict_ms / 1000.0
     controller = Leap.Controller()
 
+    # Optionally record every frame to disk for later replay
+    if record_path:
+        listener.recorder = FrameRecorder(record_path)
+        listener.recorder.start()
+        print("Recording frames to " + record_path)
+
     controller.add_listener(listener)
 
     print("Press enter to quit")
@@ -99,9 +277,20 @@ def main():
         pass
     finally:
         controller.remove_listener(listener)
+        if listener.recorder:
+            listener.recorder.stop()
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Control Google Earth with a Leap Motion sensor.")
+    parser.add_argument("--record", metavar="FILE", help="append every frame to a recording file")
+    parser.add_argument("--replay", metavar="FILE", help="play a recording instead of reading the sensor")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay rate, 0 plays as fast as possible")
+    parser.add_argument("--predict", metavar="MS", type=float, help="act on hand positions predicted this many ms ahead")
+    args = parser.parse_args()
+    if args.replay:
+        replay(args.replay, args.speed, args.predict)
+    else:
+        main(record_path=args.record, predict_ms=args.predict)
 
 
 
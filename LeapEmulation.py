@@ -0,0 +1,472 @@
+'''
+Pure-Python stand-in for the Leap Motion SDK module.
+Implements the part of Leap.py this project uses (Controller, Listener, Frame, HandList, Hand,
+Vector, Gesture and the math constants) with plain Python attributes, so the control logic runs on
+machines without LeapPython.pyd/Leap.dll, such as Linux CI, and can be fed synthetic or recorded data.
+
+Modules fall back to it automatically when the native SDK cannot be imported:
+
+    try:
+        import Leap
+    except ImportError:
+        import LeapEmulation as Leap
+
+Frames serialize to a small struct layout of their own (not the SDK format), so FrameRecorder and
+FramePlayer work unchanged on top of this module.
+'''
+
+import collections
+import ctypes
+import math
+import struct
+
+PI = math.pi
+DEG_TO_RAD = math.pi / 180.0
+RAD_TO_DEG = 180.0 / math.pi
+EPSILON = 1.192092896e-07
+
+# Flat layout of one hand, used by Frame.from_array and the serialized format
+HAND_FIELDS = (
+    "id", "is_left", "confidence",
+    "palm_x", "palm_y", "palm_z",
+    "velocity_x", "velocity_y", "velocity_z",
+    "normal_x", "normal_y", "normal_z",
+    "direction_x", "direction_y", "direction_z",
+)
+HAND_WIDTH = len(HAND_FIELDS)
+
+_FRAME_HEADER = struct.Struct("<qqI")   # id, timestamp, hand count
+_HAND_RECORD = struct.Struct("<i?13d")  # id, is_left, confidence and four vectors
+
+
+# Vector Class:
+# Three floats with the SDK's derived angles. Angles are in radians.
+class Vector(object):
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        self.x = x
+        self.y = y
+        self.z = z
+
+    @property
+    def pitch(self):
+        return math.atan2(self.y, -self.z)
+
+    @property
+    def yaw(self):
+        return math.atan2(self.x, -self.z)
+
+    @property
+    def roll(self):
+        return math.atan2(self.x, -self.y)
+
+    @property
+    def magnitude(self):
+        return math.sqrt(self.x * self.x + self.y * self.y + self.z * self.z)
+
+    @property
+    def magnitude_squared(self):
+        return self.x * self.x + self.y * self.y + self.z * self.z
+
+    @property
+    def normalized(self):
+        length = self.magnitude
+        if length <= EPSILON:
+            return Vector()
+        return Vector(self.x / length, self.y / length, self.z / length)
+
+    def distance_to(self, other):
+        return (self - other).magnitude
+
+    def angle_to(self, other):
+        denominator = self.magnitude_squared * other.magnitude_squared
+        if denominator <= EPSILON:
+            return 0.0
+        return math.acos(max(-1.0, min(1.0, self.dot(other) / math.sqrt(denominator))))
+
+    def dot(self, other):
+        return self.x * other.x + self.y * other.y + self.z * other.z
+
+    def cross(self, other):
+        return Vector(self.y * other.z - self.z * other.y,
+                      self.z * other.x - self.x * other.z,
+                      self.x * other.y - self.y * other.x)
+
+    def __add__(self, other):
+        return Vector(self.x + other.x, self.y + other.y, self.z + other.z)
+
+    def __sub__(self, other):
+        return Vector(self.x - other.x, self.y - other.y, self.z - other.z)
+
+    def __mul__(self, scalar):
+        return Vector(self.x * scalar, self.y * scalar, self.z * scalar)
+
+    def __neg__(self):
+        return Vector(-self.x, -self.y, -self.z)
+
+    def __getitem__(self, index):
+        return (self.x, self.y, self.z)[index]
+
+    def __eq__(self, other):
+        return isinstance(other, Vector) and self.to_tuple() == other.to_tuple()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def is_valid(self):
+        return all(not math.isnan(value) and not math.isinf(value) for value in (self.x, self.y, self.z))
+
+    def to_float_array(self):
+        return [self.x, self.y, self.z]
+
+    def to_tuple(self):
+        return (self.x, self.y, self.z)
+
+    def __repr__(self):
+        return "({:.6g}, {:.6g}, {:.6g})".format(self.x, self.y, self.z)
+
+    __str__ = __repr__
+
+
+# Hand Class:
+# One tracked hand. Attribute names match Leap.Hand.
+class Hand(object):
+    __slots__ = ("id", "is_left", "confidence", "palm_position", "palm_velocity",
+                 "palm_normal", "direction", "is_valid", "frame")
+
+    def __init__(self, hand_id=-1, is_left=False, confidence=0.0, palm_position=None,
+                 palm_velocity=None, palm_normal=None, direction=None, is_valid=True):
+        self.id = hand_id
+        self.is_left = is_left
+        self.confidence = confidence
+        self.palm_position = palm_position or Vector()
+        self.palm_velocity = palm_velocity or Vector()
+        self.palm_normal = palm_normal or Vector(0.0, -1.0, 0.0)
+        self.direction = direction or Vector(0.0, 0.0, -1.0)
+        self.is_valid = is_valid
+        self.frame = None
+
+    @property
+    def is_right(self):
+        return not self.is_left
+
+    @classmethod
+    def from_row(cls, row):
+        """Build a hand from HAND_WIDTH values laid out as HAND_FIELDS."""
+        return cls(int(row[0]), bool(row[1]), float(row[2]),
+                   Vector(float(row[3]), float(row[4]), float(row[5])),
+                   Vector(float(row[6]), float(row[7]), float(row[8])),
+                   Vector(float(row[9]), float(row[10]), float(row[11])),
+                   Vector(float(row[12]), float(row[13]), float(row[14])))
+
+    def to_row(self):
+        return ((self.id, self.is_left, self.confidence) + self.palm_position.to_tuple() +
+                self.palm_velocity.to_tuple() + self.palm_normal.to_tuple() + self.direction.to_tuple())
+
+    def __repr__(self):
+        return "Hand Id:{} Position:{}".format(self.id, self.palm_position)
+
+
+Hand.invalid = Hand(is_valid=False)
+
+
+# HandList Class:
+# A list of hands with the SDK's helper properties.
+class HandList(list):
+
+    @property
+    def is_empty(self):
+        return not self
+
+    @property
+    def leftmost(self):
+        return min(self, key=lambda hand: hand.palm_position.x) if self else Hand.invalid
+
+    @property
+    def rightmost(self):
+        return max(self, key=lambda hand: hand.palm_position.x) if self else Hand.invalid
+
+    @property
+    def frontmost(self):
+        return min(self, key=lambda hand: hand.palm_position.z) if self else Hand.invalid
+
+
+# Gesture Classes:
+# Gestures carry their data as plain attributes. Like the SDK, SwipeGesture(gesture) and friends
+# give a typed view of a generic gesture.
+class Gesture(object):
+    TYPE_INVALID = -1
+    TYPE_SWIPE = 1
+    TYPE_CIRCLE = 4
+    TYPE_SCREEN_TAP = 5
+    TYPE_KEY_TAP = 6
+    STATE_INVALID = -1
+    STATE_START = 1
+    STATE_UPDATE = 2
+    STATE_STOP = 3
+
+    default_type = TYPE_INVALID
+
+    def __init__(self, gesture=None, **attributes):
+        """Create a gesture, or copy one when another gesture is given.
+
+        Args:
+        - gesture (Gesture, optional): Gesture to copy, used for typed views.
+        - attributes: id, type, state, duration (microseconds), hands and any type specific values
+          such as direction, position, progress or radius.
+        """
+        if gesture is not None:
+            self.__dict__.update(gesture.__dict__)
+        else:
+            self.id = -1
+            self.type = self.default_type
+            self.state = Gesture.STATE_INVALID
+            self.duration = 0
+            self.hands = HandList()
+        self.__dict__.update(attributes)
+
+    @property
+    def duration_seconds(self):
+        return self.duration / 1e6
+
+    @property
+    def is_valid(self):
+        return self.type != Gesture.TYPE_INVALID
+
+
+class SwipeGesture(Gesture):
+    default_type = Gesture.TYPE_SWIPE
+
+
+class CircleGesture(Gesture):
+    default_type = Gesture.TYPE_CIRCLE
+
+
+class ScreenTapGesture(Gesture):
+    default_type = Gesture.TYPE_SCREEN_TAP
+
+
+class KeyTapGesture(Gesture):
+    default_type = Gesture.TYPE_KEY_TAP
+
+
+class GestureList(list):
+
+    @property
+    def is_empty(self):
+        return not self
+
+
+# Frame Class:
+# One tracking frame. Frames pushed through a Controller are linked to the previous one, which
+# lets gestures(sinceFrame) collect the gestures of every frame in between.
+class Frame(object):
+
+    def __init__(self, frame_id=0, timestamp=0, hands=None, gestures=None):
+        self.id = frame_id
+        self.timestamp = timestamp
+        self.hands = HandList(hands or [])
+        self.previous = None
+        self._gestures = GestureList(gestures or [])
+        for hand in self.hands:
+            hand.frame = self
+
+    @classmethod
+    def from_array(cls, frame_id, timestamp, values):
+        """Build a frame from a flat sequence of hands laid out as HAND_FIELDS.
+
+        Args:
+        - frame_id (int): Frame id.
+        - timestamp (int): Timestamp in microseconds.
+        - values: Sequence (list, array.array or NumPy array) of HAND_WIDTH values per hand.
+        """
+        values = list(values)
+        hands = [Hand.from_row(values[start:start + HAND_WIDTH])
+                 for start in range(0, len(values) - HAND_WIDTH + 1, HAND_WIDTH)]
+        return cls(frame_id, timestamp, hands)
+
+    @property
+    def is_valid(self):
+        return self.id >= 0
+
+    def hand(self, id):
+        for hand in self.hands:
+            if hand.id == id:
+                return hand
+        return Hand.invalid
+
+    def gestures(self, sinceFrame=None):
+        if sinceFrame is None:
+            return GestureList(self._gestures)
+        collected = GestureList()
+        frame = self
+        while frame is not None and frame.id > sinceFrame.id:
+            collected.extend(frame._gestures)
+            frame = frame.previous
+        return collected
+
+    def gesture(self, id):
+        for gesture in self._gestures:
+            if gesture.id == id:
+                return gesture
+        return Gesture()
+
+    @property
+    def serialize_length(self):
+        return _FRAME_HEADER.size + len(self.hands) * _HAND_RECORD.size
+
+    def pack_into(self, buffer, offset=0):
+        _FRAME_HEADER.pack_into(buffer, offset, self.id, self.timestamp, len(self.hands))
+        offset += _FRAME_HEADER.size
+        for hand in self.hands:
+            _HAND_RECORD.pack_into(buffer, offset, *hand.to_row())
+            offset += _HAND_RECORD.size
+
+    @classmethod
+    def unpack_from(cls, buffer, offset=0):
+        frame_id, timestamp, count = _FRAME_HEADER.unpack_from(buffer, offset)
+        offset += _FRAME_HEADER.size
+        hands = []
+        for _ in range(count):
+            hands.append(Hand.from_row(_HAND_RECORD.unpack_from(buffer, offset)))
+            offset += _HAND_RECORD.size
+        return cls(frame_id, timestamp, hands)
+
+    def __repr__(self):
+        return "Frame Id:{} Timestamp:{} Hands:{}".format(self.id, self.timestamp, len(self.hands))
+
+
+Frame.invalid = Frame(-1)
+
+
+# byte_array Class:
+# Writable buffer standing in for the SWIG byte_array used by Frame serialization.
+class byte_array(bytearray):
+
+    def cast(self):
+        """Return the address of the first byte, like the SWIG pointer cast."""
+        return ctypes.addressof(ctypes.c_char.from_buffer(self))
+
+
+# LeapPython Class:
+# The two low-level serialization entry points recording.py calls on the native module.
+class LeapPython(object):
+
+    @staticmethod
+    def Frame_serialize(frame, buffer):
+        frame.pack_into(buffer)
+
+    @staticmethod
+    def Frame_deserialize(frame, buffer, length):
+        decoded = Frame.unpack_from(buffer)
+        frame.__dict__.update(decoded.__dict__)
+        for hand in frame.hands:
+            hand.frame = frame
+
+
+# Listener Class:
+# Base class with no-op callbacks, like Leap.Listener.
+class Listener(object):
+
+    def on_init(self, controller):
+        pass
+
+    def on_connect(self, controller):
+        pass
+
+    def on_disconnect(self, controller):
+        pass
+
+    def on_exit(self, controller):
+        pass
+
+    def on_frame(self, controller):
+        pass
+
+    def on_focus_gained(self, controller):
+        pass
+
+    def on_focus_lost(self, controller):
+        pass
+
+
+# Controller Class:
+# Frames are supplied with push() instead of coming from a device.
+class Controller(object):
+    POLICY_DEFAULT = 0
+    POLICY_BACKGROUND_FRAMES = 1 << 0
+    POLICY_IMAGES = 1 << 1
+    POLICY_OPTIMIZE_HMD = 1 << 2
+    POLICY_ALLOW_PAUSE_RESUME = 1 << 3
+    POLICY_RAW_IMAGES = 1 << 6
+
+    def __init__(self, listener=None, history=60):
+        self.listeners = []
+        self.policy_flags = Controller.POLICY_DEFAULT
+        self.is_connected = True
+        self.has_focus = True
+        self._history = collections.deque(maxlen=history)
+        self._gestures = set()
+        self._paused = False
+        if listener is not None:
+            self.add_listener(listener)
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+        listener.on_init(self)
+        if self.is_connected:
+            listener.on_connect(self)
+        return True
+
+    def remove_listener(self, listener):
+        if listener not in self.listeners:
+            return False
+        self.listeners.remove(listener)
+        listener.on_exit(self)
+        return True
+
+    def push(self, frame):
+        """Make a frame current and deliver it to the listeners, unless paused."""
+        if self._history:
+            frame.previous = self._history[-1]
+        self._history.append(frame)
+        if self._paused:
+            return
+        for listener in self.listeners:
+            listener.on_frame(self)
+
+    def frame(self, history=0):
+        if history >= len(self._history):
+            return Frame.invalid
+        return self._history[-1 - history]
+
+    def now(self):
+        return self._history[-1].timestamp if self._history else 0
+
+    def enable_gesture(self, type, enable=True):
+        if enable:
+            self._gestures.add(type)
+        else:
+            self._gestures.discard(type)
+
+    def is_gesture_enabled(self, type):
+        return type in self._gestures
+
+    def set_paused(self, pause):
+        self._paused = pause
+
+    def is_paused(self):
+        return self._paused
+
+    def is_service_connected(self):
+        return True
+
+    def set_policy(self, policy):
+        self.policy_flags |= policy
+
+    def clear_policy(self, policy):
+        self.policy_flags &= ~policy
+
+    def is_policy_set(self, policy):
+        return bool(self.policy_flags & policy)
@@ -0,0 +1,194 @@
+'''
+Actuator subsystem for Google Earth output.
+Behaviors submit timed commands ("hold key X for N ms", "drag by dx") which are carried out on a
+dedicated scheduler thread, so the Leap Motion frame callback never sleeps while a key is held.
+
+Every command belongs to an axis (e.g. "pitch", "roll", "yaw"). A new command for an axis replaces
+the pending one for that axis instead of queueing behind it.
+
+Keys the actuator pressed must also be released through it (release or release_all). Releasing them
+elsewhere leaves the actuator believing they are down, and it would never press them again.
+'''
+
+import threading
+import time
+
+import keyboard
+import mouse
+
+_clock = getattr(time, "monotonic", time.time)
+
+
+# HoldKey Class:
+# A command that keeps a key pressed until its release deadline.
+class HoldKey(object):
+    __slots__ = ("key", "duration")
+
+    def __init__(self, key, duration_ms):
+        self.key = key
+        self.duration = max(float(duration_ms), 0.0) / 1000.0
+
+
+# Drag Class:
+# A command that drags the view with the middle mouse button by a relative offset.
+class Drag(object):
+    __slots__ = ("dx", "dy")
+
+    def __init__(self, dx, dy=0):
+        self.dx = dx
+        self.dy = dy
+
+
+# Actuator Class:
+# Owns the scheduler thread and the keys it is currently holding.
+class Actuator(object):
+
+    def __init__(self, key_down=keyboard.press, key_up=keyboard.release, drag=None):
+        """Constructor for the Actuator class.
+
+        Args:
+        - key_down (callable, optional): Function used to press a key. Default is keyboard.press.
+        - key_up (callable, optional): Function used to release a key. Default is keyboard.release.
+        - drag (callable, optional): Function called with (dx, dy) to drag the view. Default uses the middle mouse button.
+        """
+        self._key_down = key_down
+        self._key_up = key_up
+        self._drag = drag or _middle_drag
+        self._cond = threading.Condition()
+        self._pending = {}  # axis -> command waiting to be applied
+        self._held = {}     # axis -> [key, release_at], only touched by the scheduler thread
+        self._release_all = False  # Set by release_all, handled by the scheduler before the pending commands
+        self._thread = None
+        self._running = False
+        self.replaced = 0   # Commands overwritten before the scheduler picked them up
+
+    def start(self):
+        """Start the scheduler thread if it is not already running."""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="Actuator")
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self, timeout=1.0):
+        """Stop the scheduler thread and release every key it holds."""
+        with self._cond:
+            if not self._running:
+                return
+            self._running = False
+            self._pending.clear()
+            self._cond.notify()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def hold_key(self, axis, key, duration_ms):
+        """Hold a key for the given number of milliseconds.
+
+        Args:
+        - axis (str): The movement axis the key belongs to.
+        - key (str): Key name as understood by the keyboard module.
+        - duration_ms (float): How long to keep the key pressed.
+        """
+        self._submit(axis, HoldKey(key, duration_ms))
+
+    def drag(self, axis, dx, dy=0):
+        """Drag the view by a relative offset.
+
+        Args:
+        - axis (str): The movement axis the drag belongs to.
+        - dx (float): Horizontal offset in pixels.
+        - dy (float, optional): Vertical offset in pixels. Default is 0.
+        """
+        self._submit(axis, Drag(dx, dy))
+
+    def release(self, axis):
+        """Release whatever the given axis is holding as soon as possible."""
+        self._submit(axis, HoldKey(None, 0))
+
+    def release_all(self):
+        """Release every key the actuator holds and drop the commands not applied yet."""
+        with self._cond:
+            if not self._running:
+                return
+            self._pending.clear()
+            self._release_all = True
+            self._cond.notify()
+
+    def _submit(self, axis, command):
+        if not self._running:
+            self.start()
+        with self._cond:
+            if axis in self._pending:
+                self.replaced += 1
+            self._pending[axis] = command
+            self._cond.notify()
+
+    # Scheduler thread
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and not self._pending and not self._release_all:
+                    timeout = self._next_timeout()
+                    if timeout is not None and timeout <= 0:
+                        break
+                    self._cond.wait(timeout)
+                if not self._running:
+                    break
+                pending, self._pending = self._pending, {}
+                release_all, self._release_all = self._release_all, False
+
+            # OS events are sent outside the lock so submitters never wait on them
+            if release_all:
+                for key, _ in self._held.values():
+                    self._key_up(key)
+                self._held.clear()
+            now = _clock()
+            for axis, command in pending.items():
+                self._apply(axis, command, now)
+            self._release_expired(_clock())
+
+        for key, _ in self._held.values():
+            self._key_up(key)
+        self._held.clear()
+
+    def _apply(self, axis, command, now):
+        held = self._held.get(axis)
+
+        if isinstance(command, Drag):
+            self._drag(command.dx, command.dy)
+            return
+
+        if held and held[0] != command.key:
+            self._key_up(held[0])
+            del self._held[axis]
+            held = None
+
+        if command.key is None:
+            return
+
+        if held:
+            # Same key is already down, only move the release deadline
+            held[1] = now + command.duration
+        else:
+            self._key_down(command.key)
+            self._held[axis] = [command.key, now + command.duration]
+
+    def _release_expired(self, now):
+        for axis, (key, release_at) in list(self._held.items()):
+            if release_at <= now:
+                self._key_up(key)
+                del self._held[axis]
+
+    def _next_timeout(self):
+        if not self._held:
+            return None
+        return min(release_at for _, release_at in self._held.values()) - _clock()
+
+
+def _middle_drag(dx, dy):
+    mouse.press(button='middle')
+    mouse.move(dx, dy, absolute=False)
+    mouse.release(button='middle')
@@ -1,10 +1,22 @@
-import Leap
+try:
+    import Leap
+except ImportError:
+    import LeapEmulation as Leap  # No native SDK available, e.g. on Linux CI
 import mouse
 import time 
-import math
-import keyboard
+import numpy as np
 import pyautogui
-from Leap import Gesture 
+from actuator import Actuator
+from curves import speed_curve, zoom_curve
+from filters import FilterStage, OneEuroFilter
+from keystate import KeyState
+from macros import MacroRunner, Step
+from streetview import StreetViewDetector
+from timers import TimerWheel
+from tracker import HandTracker
+from uistate import UIStateService
+from wheel import WheelAccumulator
+from zones import ZoneDiscretizer
 
 # BaseBehavior Class:
 # This is a parent class that provides a blueprint for other behavior classes.
@@ -18,9 +30,27 @@ class BaseBehavior(object):
     exitingStreetView = False
     switchingPlanet = False
     currentPlanet = "Earth"
-    planetSwitchTime = time.time()
     autoSwitchTime = time.time()
     last_hand_detected_time = None
+    history = None  # HandHistory ring buffer, assigned by the ConfigurationManager
+    smoothing = None  # Optional FilterStage the ConfigurationManager runs over the hands before execute
+    prediction = None  # Optional PosePredictor applied after smoothing
+    hand_policy = "first_seen"  # How the controlling hand is picked when several are in view, see tracker.py
+    # Response curves, compiled into lookup tables once at startup. Override per behavior to tune.
+    zoom_response = zoom_curve()  # Palm height (mm) -> mouse wheel strength
+    move_response = speed_curve(90.0)  # Pitch and roll (degrees) -> key hold strength
+    turn_response = speed_curve(90.0)  # Yaw (degrees) -> drag strength
+    keys = KeyState()  # Shared record of held keys, only sends events on a change
+    actuator = Actuator(key_down=keys.press, key_up=keys.release)  # Shared output thread for timed key holds and drags
+    wheel = WheelAccumulator()  # Zoom output, sends whole wheel notches at a bounded rate
+    street_view = StreetViewDetector()  # Background sampler of the "Exit Street View" button pixel
+    ui_state = UIStateService()  # Optional Google Earth UI classifier, started by the listener
+    macros = MacroRunner()  # Runs UI sequences (search, planet menu) off the frame thread
+    timers = TimerWheel()  # Shared wheel for idle and cooldown deadlines
+    google_earth_active = False  # Whether Google Earth was in front on the current frame, set by the listener
+    focus_retry = 1.0  # Seconds before an idle timer that found another window in front tries again
+    planet_switch_cooldown = 7  # Seconds before another operator planet switch is accepted
+    operator_priority = 1  # Macro priority of operator commands, they preempt automatic navigation
 
     def __init__(self, name):
         """Constructor for the BaseBehavior class.
@@ -29,13 +59,15 @@ class BaseBehavior(object):
         - name (str): Name of the behavior.
         """
         self.name = name
+        self.tracker = HandTracker(self.hand_policy)
+        self.planet_cooldown = self.timers.timer(self._end_planet_switch, self.planet_switch_cooldown)
 
     def execute(self, frame):
         """Method to execute the behavior. 
         This method should be overridden in derived classes to implement specific behavior.
         
         Args:
-        - frame: The frame data from the UltraLeap device.
+        - frame (HandFrame): Hand snapshots taken from the UltraLeap frame.
         
         Raises:
         - NotImplementedError: If the method is not overridden in the derived class.
@@ -44,7 +76,7 @@ class BaseBehavior(object):
     
     # Common movement functions 
 
-    def navigate_to(self, destination):
+    def navigate_to(self, destination, priority=0):
         """Navigate to a specific destination in Google Earth.
         
         This function simulates keypresses and mouse interactions to navigate to 
@@ -52,167 +84,181 @@ class BaseBehavior(object):
         
         Args:
         - destination (str): The name or address of the destination in Google Earth.
+        - priority (int, optional): Macro priority, see operator_priority. Default is 0.
         
         Note: This function currently has hardcoded behavior to navigate to the 
         Arizona Science Center, this should be updated if other destinations are intended.
-        """
-        # Simulate Ctrl + F to focus on the search bar
-        pyautogui.hotkey('/')
-        time.sleep(0.5)  # Wait for a short duration to ensure the search bar is focused
-        
-        # Type the destination
-        pyautogui.write(destination)
-        time.sleep(0.5)  # Wait again before pressing Enter
-        
-        # Simulate Enter key to initiate the search
-        pyautogui.press('enter')
-        
-        # Right-click after searching (Exit out of search to allow for keyboard controls)
-        pyautogui.rightClick()
 
-    def sigmoid(self, x):
-        """Computes the sigmoid of the input value.
-        
-        The sigmoid function maps any input value to an output value between 0 and 1.
-        
-        Args:
-        - x (float): Input value.
-        
         Returns:
-        - float: The sigmoid of the input value.
+        - Macro: The queued macro. The sequence runs on the macro thread and this returns immediately.
         """
-        return 1 / (1 + math.exp(-x))
+        return self.macros.run("Navigate to " + destination, [
+            # Simulate Ctrl + F to focus on the search bar, then wait until it is focused
+            Step(lambda: pyautogui.hotkey('/'), until=lambda: self.ui_confirms("search_open", True), timeout=0.5),
 
-    def movement_speed(self, value):
-        """Calculate movement speed based on input value.
-        
-        Args:
-        - value (float): Input value.
-        
-        Returns:
-        - float: The calculated movement speed.
-        """
-        return float(value) / 90.0
+            # Type the destination, wait again before pressing Enter
+            Step(lambda: pyautogui.write(destination), timeout=0.5),
+
+            # Simulate Enter key to initiate the search
+            Step(lambda: pyautogui.press('enter')),
+
+            # Right-click after searching (Exit out of search to allow for keyboard controls)
+            Step(pyautogui.rightClick),
+        ], priority)
+
+    def exponential_zoom(self, distance):
+        """Calculate an exponential zoom factor based on the distance from the sensor.
+
+        The factor comes from the compiled zoom_response curve, a sigmoid of the fourth power of the
+        normalized distance below 120 mm (zoom in) and above 140 mm (zoom out).
 
-    def exponential_zoom(self, distance, zoom_in_threshold=120, zoom_out_threshold=140, scale_factor=15, power=4):
-        """Calculate an exponential zoom factor based on the distance from a sensor using a sigmoid curve.
-        
         Args:
         - distance (float): Current distance to the sensor.
-        - zoom_in_threshold (float, optional): Maximum distance for zooming in. Default is 160.
-        - zoom_out_threshold (float, optional): Minimum distance for starting to zoom out. Default is 300.
-        - scale_factor (float, optional): Determines the sharpness of the sigmoid curve. Higher values give a sharper curve. Default is 10.
-        - power (float, optional): Power to which the normalized distance is raised to slow down zoom near thresholds. Default is 3.
-        
+
         Returns:
         - float: A zoom factor. Positive values indicate zooming in, while negative values indicate zooming out.
         """
-        
-         # For zooming in
-        if distance <= zoom_in_threshold:
-            normalized_distance = (float(distance) / zoom_in_threshold) ** power
-            return (1 - self.sigmoid(scale_factor * (normalized_distance - 0.5))) * 1.5
-        
-        # For zooming out
-        elif distance > zoom_out_threshold:
-            normalized_distance = ((distance - zoom_out_threshold) / (zoom_in_threshold - zoom_out_threshold)) ** power
-            #print(" " + str(self.exitingStreetView) + " + " + str(self.inStreetView()))
-            if(self.inStreetView() and self.exitingStreetView == False): 
-                self.exitStreetView()
-
-            return (-self.sigmoid(scale_factor * (normalized_distance - 0.5))) * 1.5
-        
-        # No zooming for distances between the two thresholds
-        return 0
+        zoom = self.zoom_response(distance)
+
+        # Zooming out also leaves Street View
+        if zoom < 0 and self.inStreetView() and self.exitingStreetView == False:
+            self.exitStreetView()
+
+        return zoom
 
     def inStreetView(self):
         """Check if Google Earth is in "Street View" mode based on the pixel color of the "Exit Street View" button.
 
+        The pixel is sampled in the background by the UIStateService if it is running, otherwise by
+        the StreetViewDetector, so this only reads the last published result.
+
         Returns:
         - bool: True if in Street View, False otherwise.
         """
-        
-        # Coordinates of the pixel to check (this needs to be adjusted to where the "Exit Street View" button is)
-        x, y = 1893, 38  # Assuming top-right corner, but this might need fine-tuning
-
-        # Capture the pixel color at the specified location
-        pixel_color = pyautogui.screenshot().getpixel((x, y))
-        #print(pixel_color)
-        # Define the expected color of the "Exit Street View" button (assuming white, but this might need adjustment)
-        # The values might need fine-tuning based on the exact color in your Google Earth version
-        expected_color = (252, 252, 252) 
-
-        # Compare the captured pixel color to the expected color
-        return pixel_color == expected_color
+        if self.ui_state.running:
+            return self.ui_state.state.street_view
+        return self.street_view.in_street_view
+
+    def ui_confirms(self, field, value):
+        """Check whether the UIStateService is running and currently reports a value.
+
+        Args:
+        - field (str): UIState field, e.g. "planet" or "street_view".
+        - value: Expected value.
+
+        Returns:
+        - bool: True if the UI confirms the value, False if it does not or the service is not running.
+        """
+        return self.ui_state.running and getattr(self.ui_state.state, field) == value
     
     def exitStreetView(self):
         start_time = time.time()
         exitingStreetView = True
         pyautogui.press('esc')
     
-    def _move_to_planets(self, offset=0):
-        pyautogui.moveTo(103, 13)
-        pyautogui.click()
-        pyautogui.moveTo(232, 398 - offset)
-        pyautogui.click()
-        pyautogui.moveTo(491, 397 - offset)
-
-    def _move_to_moon(self, offset=0):
-        self._move_to_planets(offset)
-        pyautogui.moveTo(491, 478 - offset)
-        pyautogui.click()
-        pyautogui.moveTo(self.screen_width / 2.0, self.screen_height / 2.0)
-
-    def _move_to_mars(self, offset=0):
-        self._move_to_planets(offset)
-        pyautogui.moveTo(491, 453 - offset)
-        pyautogui.click()
-        pyautogui.moveTo(self.screen_width / 2.0, self.screen_height / 2.0)
-
-    def _move_to_earth(self, offset=0):
-        self._move_to_planets(offset)
-        pyautogui.click()
-        pyautogui.moveTo(self.screen_width / 2.0, self.screen_height / 2.0)
-        self.last_hand_detected_time = time.time()
-
-    def _switch_to_target_planet(self, target_planet):
-        """Private method to switch to a given target planet with the required offset."""
+    # Planet switching runs as a macro. Each of these returns the steps of one menu sequence.
+
+    def _planets_steps(self, offset=0):
+        return [
+            Step(lambda: pyautogui.moveTo(103, 13)),
+            Step(pyautogui.click),
+            Step(lambda: pyautogui.moveTo(232, 398 - offset)),
+            Step(pyautogui.click),
+            Step(lambda: pyautogui.moveTo(491, 397 - offset)),
+        ]
+
+    def _moon_steps(self, offset=0):
+        return self._planets_steps(offset) + [
+            Step(lambda: pyautogui.moveTo(491, 478 - offset)),
+            Step(pyautogui.click),
+            Step(lambda: pyautogui.moveTo(self.screen_width / 2.0, self.screen_height / 2.0)),
+        ]
+
+    def _mars_steps(self, offset=0):
+        return self._planets_steps(offset) + [
+            Step(lambda: pyautogui.moveTo(491, 453 - offset)),
+            Step(pyautogui.click),
+            Step(lambda: pyautogui.moveTo(self.screen_width / 2.0, self.screen_height / 2.0)),
+        ]
+
+    def _earth_steps(self, offset=0):
+        def recenter():
+            pyautogui.moveTo(self.screen_width / 2.0, self.screen_height / 2.0)
+            BaseBehavior.last_hand_detected_time = time.time()
+
+        return self._planets_steps(offset) + [Step(pyautogui.click), Step(recenter)]
+
+    def _switch_to_target_planet(self, target_planet, priority=0):
+        """Private method to switch to a given target planet with the required offset.
+
+        Returns:
+        - Macro: The queued switch, or None if already on that planet or the planet is unknown.
+        """
         offset = 0 if self.currentPlanet == "Earth" else 20
 
-        planet_actions = {
-            "Moon": self._move_to_moon,
-            "Mars": self._move_to_mars,
-            "Earth": self._move_to_earth
+        planet_steps = {
+            "Moon": self._moon_steps,
+            "Mars": self._mars_steps,
+            "Earth": self._earth_steps
         }
 
-        if target_planet in planet_actions and self.currentPlanet != target_planet:
-            planet_actions[target_planet](offset)
-            self.currentPlanet = target_planet
+        if target_planet in planet_steps and self.currentPlanet != target_planet:
+            steps = planet_steps[target_planet](offset)
+            if self.ui_state.running:
+                # Keep the UI to ourselves until Google Earth shows the new planet
+                steps.append(Step(until=lambda: self.ui_confirms("planet", target_planet), timeout=7))
+            # Only a macro that ran to its end moved to the planet, a preempted one leaves it as it was
+            steps.append(Step(lambda: self._arrived_at(target_planet)))
+            return self.macros.run("Switch to " + target_planet, steps, priority)
+        return None
 
-    def switch_planets(self, target_planet):
-        if round(time.time() - self.planetSwitchTime) > 7 and self.switchingPlanet:
-            self.switchingPlanet = False
+    def _arrived_at(self, planet):
+        """Last step of a planet switch macro. The planet is shared by every behavior, like the UI."""
+        BaseBehavior.currentPlanet = planet
 
-        if not self.switchingPlanet:
-            self.switchingPlanet = True
-            self.planetSwitchTime = time.time()
-            self._switch_to_target_planet(target_planet)
+    def switch_planets(self, target_planet):
+        """Operator planet switch, ignored during the cooldown after the previous one.
 
-    def rotate_planets(self):
+        Returns:
+        - bool: True if a switch was started.
+        """
+        # The cooldown timer ends the switch, the UI can end it early by showing the planet we switched to
+        if self.switchingPlanet and self.ui_confirms("planet", self.currentPlanet):
+            self._end_planet_switch()
+
+        if self.switchingPlanet:
+            return False
+        # Operator requests take over from automatic navigation
+        if self._switch_to_target_planet(target_planet, self.operator_priority) is None:
+            return False
+        self.switchingPlanet = True
+        self.planet_cooldown.arm()
+        return True
+
+    def _end_planet_switch(self):
+        self.planet_cooldown.cancel()
+        self.switchingPlanet = False
+
+    def next_planet(self):
         next_planet = {
             "Earth": "Mars",
             "Mars": "Moon",
             "Moon": "Earth"
         }
 
-        target_planet = next_planet.get(self.currentPlanet, "Earth")  # Default to Earth if something goes wrong
-        self._switch_to_target_planet(target_planet)
+        return next_planet.get(self.currentPlanet, "Earth")  # Default to Earth if something goes wrong
+
+    def rotate_planets(self):
+        self._switch_to_target_planet(self.next_planet())
     
     def relase_keys(self):
-        pyautogui.keyUp('up')
-        pyautogui.keyUp('down')
-        pyautogui.keyUp('left')
-        pyautogui.keyUp('right')
+        # Keys held by the actuator go through it, so it presses them again on the next hold
+        self.actuator.release_all()
+        self.keys.release_all(('up', 'down', 'left', 'right'))
+
+    def deselect(self):
+        """Called when another behavior takes over. Releases the movement keys."""
+        self.relase_keys()
 
 
 # HandTiltBehavior Class:
@@ -224,16 +270,26 @@ class HandTiltBehavior(BaseBehavior):
         """Constructor for the HandTiltBehavior class.
         Initializes the name of the behavior to "handTilt".
         """
+        # Palm speeds are in mm/s, direction and normal speeds in 1/s, so they need their own beta
+        self.smoothing = FilterStage(OneEuroFilter, min_cutoff=1.0, beta=[0.01] * 3 + [1.0] * 6)
         super(HandTiltBehavior, self).__init__("handTilt")
 
     def execute(self, frame):
         """Execute the hand tilting behavior based on the frame data from the UltraLeap device.
         
         Args:
-        - frame: The frame data from the UltraLeap device.
+        - frame (HandFrame): Hand snapshots taken from the UltraLeap frame.
         
         Note: The exact behavior executed is determined by the logic inside this method.
         """
+        # Only one hand steers, a second visitor reaching in does not take over
+        controlling_hand = self.tracker.update(frame)
+
+        # Frames keep coming while a macro drives the UI, but movement output waits for it to finish
+        if self.macros.busy:
+            self.relase_keys()
+            return
+
         X_DISTANCE = 10  # Threshold for hand motion (adjust as needed)
         center_x, center_y = self.screen_width / 2, self.screen_height / 2
         auto_navigate = False
@@ -259,22 +315,19 @@ class HandTiltBehavior(BaseBehavior):
                 y < X_DISTANCE or y > self.screen_height - X_DISTANCE):
                 mouse.move(center_x, center_y)
 
-            # Iterate through each hand detected in the frame
-            for hand in frame.hands:
-                handType = "Left Hand" if hand.is_left else "Right Hand"
-                normal = hand.palm_normal
-                direction = hand.direction
-            
-                # Convert hand orientation (pitch, roll, yaw) from radians to degrees
-                pitch = direction.pitch * Leap.RAD_TO_DEG
-                roll = normal.roll * Leap.RAD_TO_DEG
-                yaw = direction.yaw * Leap.RAD_TO_DEG
+            hand = controlling_hand
+            handType = "Left Hand" if hand.is_left else "Right Hand"
 
-                # Adjust the mouse wheel based on the palm's vertical position to control zoom
-                mouse.wheel(delta=self.exponential_zoom(hand.palm_position[1]))
+            # Convert hand orientation (pitch, roll, yaw) from radians to degrees
+            pitch = hand.pitch * Leap.RAD_TO_DEG
+            roll = hand.roll * Leap.RAD_TO_DEG
+            yaw = hand.yaw * Leap.RAD_TO_DEG
 
-                # Control movement based on hand orientation
-                self.control_movement(pitch, roll, yaw)
+            # Adjust the mouse wheel based on the palm's vertical position to control zoom
+            self.wheel.add(self.exponential_zoom(hand.palm_y), frame.timestamp)
+
+            # Control movement based on hand orientation
+            self.control_movement(pitch, roll, yaw)
 
     # Supporting Function(s)
  
@@ -288,89 +341,88 @@ class HandTiltBehavior(BaseBehavior):
         """
         
         # Calculate movement speeds based on hand orientation
-        forward_backward_speed = self.movement_speed(pitch)
-        left_right_speed = self.movement_speed(roll)
-        turn_speed = self.movement_speed(yaw)
+        forward_backward_speed = self.move_response(pitch)
+        left_right_speed = self.move_response(roll)
+        turn_speed = self.turn_response(yaw)
         threshold = 0.1
 
+        # Key holds and drags run on the actuator thread so the frame callback never sleeps
+
         # Forward and Backward movement based on pitch (using arrow keys)
         if forward_backward_speed < -threshold:  # Negative pitch indicates forward movement
-            pyautogui.keyDown('up')
-            time.sleep(-forward_backward_speed)
-            pyautogui.keyUp('up')
+            self.actuator.hold_key('pitch', 'up', -forward_backward_speed * 1000)
         elif forward_backward_speed > threshold:  # Positive pitch indicates backward movement
-            pyautogui.keyDown('down')
-            time.sleep(forward_backward_speed)
-            keyboard.release('down')
+            self.actuator.hold_key('pitch', 'down', forward_backward_speed * 1000)
 
         # Left and Right movement based on roll (using arrow keys)
         if left_right_speed > threshold:  # Positive roll indicates left movement
-            pyautogui.keyDown('left')
-            time.sleep(left_right_speed)
-            keyboard.release('left')
+            self.actuator.hold_key('roll', 'left', left_right_speed * 1000)
         elif left_right_speed < -threshold:  # Negative roll indicates right movement
-            keyboard.press('right')
-            time.sleep(-left_right_speed)
-            keyboard.release('right')
+            self.actuator.hold_key('roll', 'right', -left_right_speed * 1000)
         
-        # Turning left and right based on yaw (using mouse movement)
-        if turn_speed < -threshold:  # Negative yaw indicates turning left
-            mouse.press(button='middle')
-            mouse.move(-100 * turn_speed, 0)
-            mouse.release(button='middle')
-        elif turn_speed > threshold:  # Positive yaw indicates turning right
-            mouse.press(button='middle')
-            mouse.move(100 * turn_speed, 0)
-            mouse.release(button='middle')
+        # Turning left and right based on yaw (using mouse movement), negative yaw drags left
+        if abs(turn_speed) > threshold:
+            self.actuator.drag('yaw', 100 * turn_speed, 0)
 
 # HandSlideBehavior Class:
 # This class defines the behavior when a hand slides.
 # It inherits from the BaseBehavior class and provides specific implementations for hand sliding behavior.
 class HandSlideBehavior(BaseBehavior):
 
-    def __init__(self):
+    def __init__(self, polar=False):
         """Constructor for the HandSlideBehavior class.
         Initializes the name of the behavior to "handSlide" and other related properties.
+
+        Args:
+        - polar (bool, optional): Pick one of 8 directions by the palm's angle instead of each axis on its own. Default is False.
         """
         self.auto_navigate = False
         self.timeout = 30
         self.alt = False
         BaseBehavior.currentPlanet = "Earth"
+        # Keeps palm jitter near the dead zone edges from toggling the arrow keys
+        self.smoothing = FilterStage(OneEuroFilter, min_cutoff=1.0, beta=0.01)
+        # Separate enter and exit thresholds around the dead zone, so a resting palm does not flip the arrow keys
+        self.zones = ZoneDiscretizer(enter=25, exit=15, dwell=0.08, polar=polar)
+        # Idle deadlines, armed when the hands leave and cancelled as soon as a hand shows up again
+        self.navigate_timer = self.timers.timer(self._idle_navigate, self.timeout)
+        self.rotate_timer = self.timers.timer(self._idle_rotate, 120, period=120)
         super(HandSlideBehavior, self).__init__("handSlide")
 
     def execute(self, frame):
         """Execute the hand sliding behavior based on the frame data from the UltraLeap device.
         
         Args:
-        - frame: The frame data from the UltraLeap device.
+        - frame (HandFrame): Hand snapshots taken from the UltraLeap frame.
         
         Note: The exact behavior executed is determined by the logic inside this method.
         """
-        if(round(time.time() - BaseBehavior.start_time) > 30 and BaseBehavior.exitingStreetView == True):
+        # Only one hand steers, a second visitor reaching in does not take over
+        hand = self.tracker.update(frame)
+
+        if(BaseBehavior.exitingStreetView == True and (round(time.time() - BaseBehavior.start_time) > 30 or self.ui_confirms("street_view", False))):
             #print("Exited Street View")
             BaseBehavior.exitingStreetView = False
 
         if(BaseBehavior.exitingStreetView != True and BaseBehavior.switchingPlanet != True):
-            
-            if(keyboard.is_pressed('m')):
-                print("Moving to Mars")
-                self.switch_planets("Mars")
-            if(keyboard.is_pressed('l')):
-                self.switch_planets("Moon")
-            if(keyboard.is_pressed('e')):
-                self.switch_planets("Earth")
+
+            # Frames keep coming while a macro drives the UI, but movement output waits for it to finish
+            if self.macros.busy:
+                self.zones.reset()
+                self.relase_keys()
+                return
 
             if frame.hands:
                 BaseBehavior.last_hand_detected_time = time.time()    
                 self.auto_navigate = False
+                if self.rotate_timer.armed or self.navigate_timer.armed:
+                    self.navigate_timer.cancel()
+                    self.rotate_timer.cancel()
 
-                hand = frame.hands[0]
-
-                hand_x = hand.palm_position[0]  # Left and right
-                hand_z = hand.palm_position[2]  # Forward and backward
+                hand_x = hand.palm_x  # Left and right
+                hand_z = hand.palm_z  # Forward and backward
 
-                # Constants for hand position-based motion
-                dead_zone = 20  # A zone in the center where there's no movement
+                # Constants for hand position-based motion, the dead zone is in self.zones
                 outer_limits = 200
 
                 # Check for slide
@@ -378,48 +430,126 @@ class HandSlideBehavior(BaseBehavior):
 
                     if self.alt:
                         # Using the exponential_zoom function for zooming
-                        zoomStrength = self.exponential_zoom(hand.palm_position[1])
-                        mouse.wheel(delta=zoomStrength)
+                        zoomStrength = self.exponential_zoom(hand.palm_y)
+                        self.wheel.add(zoomStrength, frame.timestamp)
                         self.alt = False 
 
                     else:
-                        if -outer_limits < hand_x < -dead_zone:
-                            keyboard.release('right')  # Ensure right arrow key is not pressed
-                            keyboard.press('left')     # Press left arrow key for left movement
-                        elif dead_zone < hand_x < outer_limits:
-                            keyboard.release('left')   # Ensure left arrow key is not pressed
-                            keyboard.press('right')    # Press right arrow key for right movement
-                        else:
-                            keyboard.release('left')
-                            keyboard.release('right')
-
-                        if -outer_limits < hand_z < -dead_zone:
-                            keyboard.release('down')  # Ensure down is not pressed
-                            keyboard.press('up')      # Keep up pressed
-                        elif dead_zone < hand_z < outer_limits:
-                            keyboard.release('up')  # Ensure up is not pressed
-                            keyboard.press('down')  # Keep down pressed
-                        else:
-                            # In the dead zone: release any keys and do not trigger any movement
-                            keyboard.release('up')
-                            keyboard.release('down')
+                        x_zone, z_zone = self.zones.update(hand_x, hand_z, frame.timestamp)
+                        self._hold_direction(x_zone, 'left', 'right')  # Left and right movement
+                        self._hold_direction(z_zone, 'up', 'down')     # Forward is up, backward is down
                         self.alt = True
                 else:
+                    self.zones.reset()
                     self.relase_keys()
 
-            # If no hands are detected and auto navigation is not active, and 30 seconds have passed since the last hand was detected
-            elif self.auto_navigate == False and BaseBehavior.last_hand_detected_time and round(time.time() - BaseBehavior.last_hand_detected_time) == 30 and BaseBehavior.currentPlanet == "Earth":
-                self.navigate_to("Arizona Science Center")
-                self.auto_navigate = True
-     
-            elif(BaseBehavior.last_hand_detected_time and int(round(time.time() - BaseBehavior.last_hand_detected_time)) != 0 and int(round(time.time() - BaseBehavior.last_hand_detected_time)) % 120 == 0):
-                self.rotate_planets()
+            # The hands just left: navigate to the Arizona Science Center after 30 seconds and rotate planets every 120 seconds
+            elif BaseBehavior.last_hand_detected_time and not self.rotate_timer.armed:
+                self.navigate_timer.arm()
+                self.rotate_timer.arm()
            
             if not frame.hands:
+                self.zones.reset()
                 self.relase_keys()
+                self.wheel.reset()
                 return
 
         # If none of the above conditions are met, release all movement keys
         else:
+            self.zones.reset()
             self.relase_keys()
             return
+
+    def _hold_direction(self, zone, negative, positive):
+        """Hold the key for one axis direction, releasing the opposite key first. Zone 0 releases both."""
+        if zone >= 0:
+            self.keys.release(negative)
+        if zone <= 0:
+            self.keys.release(positive)
+        if zone:
+            self.keys.press(negative if zone < 0 else positive)
+
+    def deselect(self):
+        """Also stop the idle timers, they are only cancelled here and in execute, which no longer runs."""
+        self.navigate_timer.cancel()
+        self.rotate_timer.cancel()
+        super(HandSlideBehavior, self).deselect()
+
+    def _idle_navigate(self):
+        """Timer callback, run on the behavior worker once the hands have been gone for self.timeout seconds."""
+        # The macro types into whatever window is in front, so wait for Google Earth to come back
+        if not BaseBehavior.google_earth_active:
+            self.navigate_timer.arm(self.focus_retry)
+            return
+        if BaseBehavior.currentPlanet == "Earth" and not BaseBehavior.exitingStreetView:
+            self.navigate_to("Arizona Science Center")
+            self.auto_navigate = True
+
+    def _idle_rotate(self):
+        """Timer callback, run on the behavior worker every 120 seconds while no hands are detected."""
+        if not BaseBehavior.google_earth_active:
+            self.rotate_timer.arm(self.focus_retry)
+            return
+        if not BaseBehavior.exitingStreetView:
+            self.rotate_planets()
+
+
+# TwoHandBehavior Class:
+# This class defines the behavior when both hands are used like a pinch on a touch screen.
+# Moving the palms apart or together zooms, turning the pair around the vertical axis turns the view.
+class TwoHandBehavior(BaseBehavior):
+
+    def __init__(self, zoom_gain=0.05, turn_gain=300.0, min_change=(1.0, 0.01)):
+        """Constructor for the TwoHandBehavior class.
+        Initializes the name of the behavior to "twoHand".
+
+        Args:
+        - zoom_gain (float, optional): Wheel notches per millimeter the palms move apart. Default is 0.05.
+        - turn_gain (float, optional): Drag pixels per radian the pair turns. Default is 300.
+        - min_change (tuple, optional): Smallest distance (mm) and angle (rad) change per frame that
+          produces output, below that it is treated as jitter. Default is (1.0, 0.01).
+        """
+        self.zoom_gain = zoom_gain
+        self.turn_gain = turn_gain
+        self.min_change = np.array(min_change)
+        self.pair = None       # Ids of the two hands in use
+        self.previous = None   # Distance and angle of the pair in the previous frame
+        self.smoothing = FilterStage(OneEuroFilter, min_cutoff=1.0, beta=0.01)
+        super(TwoHandBehavior, self).__init__("twoHand")
+
+    def execute(self, frame):
+        """Execute the two-handed zoom and turn behavior based on the frame data from the UltraLeap device.
+
+        Args:
+        - frame (HandFrame): Hand snapshots taken from the UltraLeap frame.
+        """
+        self.tracker.update(frame)
+
+        if self.macros.busy or len(frame.hands) < 2:
+            self.pair = self.previous = None
+            self.wheel.reset()
+            return
+
+        # The two hands that have been in view the longest form the pair
+        hands = sorted(frame.hands, key=lambda hand: self.tracker.hands[hand.id].first_seen)[:2]
+        pair = (hands[0].id, hands[1].id)
+
+        palms = np.array([hand.palm_position for hand in hands])
+        offset = palms[1] - palms[0]
+        # Distance and heading of the line between the palms, in the horizontal plane
+        current = np.array((np.hypot(offset[0], offset[2]), np.arctan2(offset[2], offset[0])))
+
+        if pair != self.pair:
+            self.pair, self.previous = pair, current
+            return
+
+        change = current - self.previous
+        change[1] = (change[1] + np.pi) % (2 * np.pi) - np.pi  # Shortest way around
+        moved = np.abs(change) >= self.min_change
+        self.previous = np.where(moved, current, self.previous)
+
+        # One wheel and one drag command per frame, however many hands are in view
+        if moved[0]:
+            self.wheel.add(self.zoom_gain * change[0], frame.timestamp)
+        if moved[1]:
+            self.actuator.drag('yaw', self.turn_gain * change[1], 0)
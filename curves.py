@@ -0,0 +1,151 @@
+'''
+Response curves.
+Curves that map hand measurements to output strength (palm height to zoom, tilt angles to movement
+and turn speed) are described with the small builders below: sigmoid, power, linear, piecewise,
+regions and dead zones, combined with chain. A ResponseCurve samples the description once into a
+lookup table, so evaluating it per frame is a clamp, an index and a linear interpolation instead of
+powers and exponentials. evaluate() does the same for a whole NumPy array at once, which is handy for
+plotting or tuning curves offline:
+
+    python curves.py
+
+prints the default curves next to their exact values and the largest interpolation error.
+'''
+
+import numpy as np
+
+
+def sigmoid(scale=1.0, center=0.0, gain=1.0):
+    """gain / (1 + exp(-scale * (x - center)))"""
+    return lambda x: gain / (1.0 + np.exp(-scale * (x - center)))
+
+
+def power(exponent, scale=1.0, offset=0.0):
+    """|(x - offset) / scale| ** exponent"""
+    return lambda x: np.abs((x - offset) / float(scale)) ** exponent
+
+
+def linear(slope=1.0, offset=0.0):
+    """slope * (x - offset)"""
+    return lambda x: slope * (x - offset)
+
+
+def piecewise(points):
+    """Straight lines between (x, y) points, flat beyond the first and last point."""
+    xs, ys = zip(*sorted(points))
+    return lambda x: np.interp(x, xs, ys)
+
+
+def chain(*functions):
+    """Apply functions left to right, chain(f, g)(x) == g(f(x))."""
+    def chained(x):
+        for function in functions:
+            x = function(x)
+        return x
+    return chained
+
+
+def regions(*parts, **kwargs):
+    """Use a different function per input range.
+
+    Args:
+    - parts: (low, high, function) tuples, low inclusive and high exclusive. None means unbounded.
+    - default (float, optional): Value outside every range. Default is 0.
+    """
+    default = kwargs.get("default", 0.0)
+
+    def evaluate(x):
+        x = np.asarray(x, dtype=float)
+        result = np.full(x.shape, default)
+        for low, high, function in parts:
+            inside = np.ones(x.shape, dtype=bool)
+            if low is not None:
+                inside &= x >= low
+            if high is not None:
+                inside &= x < high
+            result[inside] = function(x[inside])
+        return result
+    return evaluate
+
+
+def dead_zone(function, low, high):
+    """Zero for inputs in [low, high], function(x) elsewhere."""
+    return regions((None, low, function), (high, None, function))
+
+
+# ResponseCurve Class:
+# A curve description compiled into an interpolated lookup table over [low, high].
+class ResponseCurve(object):
+
+    def __init__(self, function, low, high, samples=4096):
+        """Constructor for the ResponseCurve class.
+
+        Args:
+        - function (callable): Vectorized curve, called once with all sample points.
+        - low, high (float): Input range. Inputs outside it get the value at the nearest end.
+        - samples (int, optional): Table size. Default is 4096.
+        """
+        self.function = function
+        self.low = float(low)
+        self.high = float(high)
+        self.xs = np.linspace(self.low, self.high, samples)
+        self.values = np.asarray(function(self.xs), dtype=float)
+        self._table = self.values.tolist()  # Plain floats are faster to index one at a time
+        self._scale = (samples - 1) / (self.high - self.low)
+        self._last = samples - 1
+
+    def __call__(self, x):
+        """Evaluate one input in O(1)."""
+        position = (x - self.low) * self._scale
+        if position <= 0:
+            return self._table[0]
+        if position >= self._last:
+            return self._table[self._last]
+        table = self._table
+        index = int(position)
+        value = table[index]
+        return value + (position - index) * (table[index + 1] - value)
+
+    def evaluate(self, xs):
+        """Evaluate an array of inputs at once."""
+        position = np.clip((np.asarray(xs, dtype=float) - self.low) * self._scale, 0, self._last)
+        index = np.minimum(position.astype(int), self._last - 1)
+        fraction = position - index
+        return self.values[index] + fraction * (self.values[index + 1] - self.values[index])
+
+    def error(self, xs=None):
+        """Largest difference between the table and the exact curve, at xs or between the samples."""
+        if xs is None:
+            xs = (self.xs[:-1] + self.xs[1:]) / 2.0
+        return float(np.max(np.abs(self.evaluate(xs) - self.function(np.asarray(xs, dtype=float)))))
+
+
+def zoom_curve(zoom_in_threshold=120, zoom_out_threshold=140, scale_factor=15, exponent=4, gain=1.5, limit=400):
+    """Palm height in millimeters to mouse wheel strength.
+
+    Below zoom_in_threshold the result rises towards +gain (zoom in) as the palm gets closer to the
+    sensor, above zoom_out_threshold it falls towards -gain (zoom out), in between it is zero.
+    """
+    return ResponseCurve(regions(
+        (None, zoom_in_threshold, chain(power(exponent, zoom_in_threshold),
+                                        sigmoid(-scale_factor, 0.5, gain))),
+        (zoom_out_threshold, None, chain(power(exponent, zoom_in_threshold - zoom_out_threshold, zoom_out_threshold),
+                                         sigmoid(scale_factor, 0.5, -gain))),
+    ), 0, limit)
+
+
+def speed_curve(divisor=90.0, dead_zone_degrees=0.0, limit=180):
+    """Hand angle in degrees to movement speed, linear with an optional dead zone."""
+    function = linear(1.0 / divisor)
+    if dead_zone_degrees:
+        function = dead_zone(function, -dead_zone_degrees, dead_zone_degrees)
+    return ResponseCurve(function, -limit, limit)
+
+
+if __name__ == "__main__":
+    for name, curve, points in (("zoom", zoom_curve(), range(0, 301, 20)),
+                                ("speed", speed_curve(), range(-90, 91, 15))):
+        print("{} curve, largest table error {:.2e}".format(name, curve.error()))
+        exact = curve.function(np.array(points, dtype=float))
+        for x, table, value in zip(points, curve.evaluate(points), exact):
+            print("  {:6.1f} -> {:8.4f}  (exact {:8.4f})".format(x, table, value))
@@ -0,0 +1,232 @@
+'''
+Smoothing filters for hand snapshots.
+Raw palm positions and hand vectors jitter by a few millimeters from frame to frame. Near a dead
+zone edge that jitter makes the behaviors press and release keys over and over. A FilterStage runs
+one of the filters below over the palm position, palm normal and direction of every tracked hand,
+frame by frame, and hands the behavior smoothed snapshots.
+
+All filters work on NumPy arrays, one element per channel, so the nine channels of a hand are
+filtered together. Each filter keeps its own state per hand id and reports, per channel, the latency
+its smoothing currently adds: the time constant of the effective blend between new and old values.
+For the EMA and One Euro filters that is also how far the output trails a steady motion; the Kalman
+filter tracks steady motion without lag, so its figure is the delay of its response to a jump.
+
+- EMAFilter: exponential moving average with a fixed blend factor.
+- OneEuroFilter: low-pass whose cutoff rises with speed, smooth when still and responsive when moving
+  (Casiez et al., 2012).
+- KalmanFilter: constant-velocity Kalman filter, one independent position and velocity state per channel.
+'''
+
+import math
+
+import numpy as np
+
+from handsnapshot import HandFrame, HandSnapshot
+
+DEFAULT_RATE = 120.0   # Frames per second assumed when timestamps do not advance
+RESET_GAP = 0.25       # Seconds without a hand after which its filter state is dropped
+
+
+def _gain_latency(gain, dt):
+    """Time constant in seconds of blending a new value with weight `gain` every `dt` seconds."""
+    gain = np.clip(gain, 1e-6, 1.0)
+    return dt * (1.0 - gain) / gain
+
+
+# EMAFilter Class:
+# value = alpha * measurement + (1 - alpha) * value
+class EMAFilter(object):
+
+    def __init__(self, alpha=0.5):
+        """Constructor for the EMAFilter class.
+
+        Args:
+        - alpha (float or array, optional): Weight of the new measurement, per channel if an array. Default is 0.5.
+        """
+        self.alpha = np.asarray(alpha, dtype=float)
+        self.value = None
+        self.latency = 0.0  # Seconds, per channel once the filter has run
+
+    def reset(self):
+        self.value = None
+
+    def __call__(self, x, dt):
+        if self.value is None:
+            self.value = np.array(x, dtype=float)
+            return self.value
+        self.value += self.alpha * (x - self.value)
+        self.latency = _gain_latency(self.alpha, dt)
+        return self.value
+
+
+# OneEuroFilter Class:
+# Speed-adaptive low-pass filter.
+class OneEuroFilter(object):
+
+    def __init__(self, min_cutoff=1.0, beta=0.0, d_cutoff=1.0):
+        """Constructor for the OneEuroFilter class.
+
+        Args:
+        - min_cutoff (float or array, optional): Cutoff frequency in Hz when the hand is still. Lower is smoother. Default is 1.
+        - beta (float or array, optional): Cutoff increase per unit of speed. Higher reacts faster to motion. Default is 0.
+        - d_cutoff (float, optional): Cutoff frequency in Hz for the speed estimate. Default is 1.
+        """
+        self.min_cutoff = np.asarray(min_cutoff, dtype=float)
+        self.beta = np.asarray(beta, dtype=float)
+        self.d_cutoff = d_cutoff
+        self.value = None
+        self.speed = None
+        self.latency = 0.0  # Seconds, per channel once the filter has run
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2.0 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def reset(self):
+        self.value = None
+        self.speed = None
+
+    def __call__(self, x, dt):
+        if self.value is None:
+            self.value = np.array(x, dtype=float)
+            self.speed = np.zeros_like(self.value)
+            return self.value
+        speed = (x - self.value) / dt
+        self.speed += self._alpha(self.d_cutoff, dt) * (speed - self.speed)
+        alpha = self._alpha(self.min_cutoff + self.beta * np.abs(self.speed), dt)
+        self.value += alpha * (x - self.value)
+        self.latency = _gain_latency(alpha, dt)
+        return self.value
+
+
+# KalmanFilter Class:
+# Constant-velocity model per channel. The 2x2 covariance of every channel is kept as three arrays.
+class KalmanFilter(object):
+
+    def __init__(self, process_noise=1e4, measurement_noise=4.0):
+        """Constructor for the KalmanFilter class.
+
+        Args:
+        - process_noise (float or array, optional): Variance of the acceleration, in units per second squared, squared. Default is 1e4.
+        - measurement_noise (float or array, optional): Variance of a measurement, in units squared. Default is 4 (2 mm standard deviation).
+        """
+        self.q = np.asarray(process_noise, dtype=float)
+        self.r = np.asarray(measurement_noise, dtype=float)
+        self.value = None
+        self.latency = 0.0  # Seconds, per channel once the filter has run
+
+    def reset(self):
+        self.value = None
+
+    def __call__(self, x, dt):
+        if self.value is None:
+            self.value = np.array(x, dtype=float)
+            self.velocity = np.zeros_like(self.value)
+            self.p00 = np.broadcast_to(self.r, self.value.shape).copy()
+            self.p01 = np.zeros_like(self.value)
+            self.p11 = np.full_like(self.value, 1e3)
+            return self.value
+
+        # Predict
+        self.value += self.velocity * dt
+        self.p00 += dt * (2.0 * self.p01 + dt * self.p11) + self.q * dt ** 4 / 4.0
+        self.p01 += dt * self.p11 + self.q * dt ** 3 / 2.0
+        self.p11 += self.q * dt ** 2
+
+        # Update
+        k0 = self.p00 / (self.p00 + self.r)
+        k1 = self.p01 / (self.p00 + self.r)
+        residual = x - self.value
+        self.value += k0 * residual
+        self.velocity += k1 * residual
+        self.p11 -= k1 * self.p01
+        self.p00 *= 1.0 - k0
+        self.p01 *= 1.0 - k0
+        self.latency = _gain_latency(k0, dt)
+        return self.value
+
+
+# FilterStage Class:
+# Applies one filter per tracked hand to palm position, normal and direction.
+class FilterStage(object):
+
+    def __init__(self, filter_class=OneEuroFilter, **params):
+        """Constructor for the FilterStage class.
+
+        Args:
+        - filter_class (class, optional): EMAFilter, OneEuroFilter or KalmanFilter. Default is OneEuroFilter.
+        - params: Keyword arguments for the filter, e.g. min_cutoff=1.0, beta=0.01. Arrays of nine
+          values tune palm, normal and direction channels separately.
+        """
+        self.filter_class = filter_class
+        self.params = params
+        self._filters = {}     # Hand id -> filter
+        self._last_seen = {}   # Hand id -> timestamp in microseconds
+        self._input = np.empty(9)
+        self.latency = 0.0              # Palm latency added to the last filtered frame, in seconds
+        self.orientation_latency = 0.0  # Same for the normal and direction
+        self._latency_sum = 0.0
+        self.frames = 0
+
+    def reset(self):
+        self._filters.clear()
+        self._last_seen.clear()
+
+    def apply(self, frame):
+        """Filter the hands of a HandFrame.
+
+        Returns:
+        - HandFrame: New frame with smoothed palm, normal and direction. Velocity is passed through.
+        """
+        if not frame.hands:
+            self._forget(frame.timestamp)
+            return frame
+
+        hands = []
+        latency = orientation_latency = 0.0
+        values = self._input
+        for hand in frame.hands:
+            last_seen = self._last_seen.get(hand.id)
+            dt = (frame.timestamp - last_seen) * 1e-6 if last_seen is not None else 0.0
+            if dt > RESET_GAP:
+                self._filters.pop(hand.id, None)
+            if dt <= 0.0 or dt > RESET_GAP:
+                dt = 1.0 / DEFAULT_RATE
+            hand_filter = self._filters.get(hand.id)
+            if hand_filter is None:
+                hand_filter = self._filters[hand.id] = self.filter_class(**self.params)
+            self._last_seen[hand.id] = frame.timestamp
+
+            values[0:3] = hand.palm_x, hand.palm_y, hand.palm_z
+            values[3:6] = hand.normal_x, hand.normal_y, hand.normal_z
+            values[6:9] = hand.direction_x, hand.direction_y, hand.direction_z
+            smoothed = hand_filter(values, dt)
+            channel_latency = np.broadcast_to(hand_filter.latency, (9,))
+            # Weigh the palm axes by how fast the hand moves along them, a still axis trails nothing
+            speed = np.abs((hand.velocity_x, hand.velocity_y, hand.velocity_z)) + 1e-3
+            latency = max(latency, float(np.dot(channel_latency[0:3], speed) / speed.sum()))
+            orientation_latency = max(orientation_latency, float(np.mean(channel_latency[3:9])))
+
+            hands.append(HandSnapshot(hand.id, hand.is_left, tuple(smoothed[0:3]),
+                                      (hand.velocity_x, hand.velocity_y, hand.velocity_z),
+                                      tuple(smoothed[3:6]), tuple(smoothed[6:9])))
+
+        self._forget(frame.timestamp)
+        self.latency = latency
+        self.orientation_latency = orientation_latency
+        self._latency_sum += latency
+        self.frames += 1
+        return HandFrame(frame.id, frame.timestamp, hands)
+
+    def _forget(self, timestamp):
+        """Drop the state of hands that have not been seen for RESET_GAP seconds."""
+        for hand_id, last_seen in list(self._last_seen.items()):
+            if (timestamp - last_seen) * 1e-6 > RESET_GAP:
+                del self._last_seen[hand_id]
+                self._filters.pop(hand_id, None)
+
+    @property
+    def mean_latency(self):
+        """Average palm latency added per filtered frame, in seconds."""
+        return self._latency_sum / self.frames if self.frames else 0.0
@@ -0,0 +1,97 @@
+'''
+Foreground window providers.
+The listener only drives Google Earth while it is the foreground window. Asking Windows for the
+foreground window title on every frame costs two system calls for a value that almost never
+changes, so CachedFocusProvider keeps the last title for a short time-to-live and counts cache hits
+and misses. FakeFocusProvider stands in on machines without pywin32, e.g. Linux test runs.
+'''
+
+import threading
+import time
+
+try:
+    import win32gui
+except ImportError:
+    win32gui = None  # Not on Windows
+
+GOOGLE_EARTH_TITLE = "Google Earth Pro"
+
+_clock = getattr(time, "monotonic", time.time)
+
+
+# Win32FocusProvider Class:
+# Reads the title of the foreground window through pywin32.
+class Win32FocusProvider(object):
+
+    def __init__(self):
+        if win32gui is None:
+            raise RuntimeError("Win32FocusProvider requires pywin32.")
+
+    def window_title(self):
+        return win32gui.GetWindowText(win32gui.GetForegroundWindow())
+
+
+# FakeFocusProvider Class:
+# Returns a title set by the caller. Counts how often it was asked.
+class FakeFocusProvider(object):
+
+    def __init__(self, title=GOOGLE_EARTH_TITLE):
+        self.title = title
+        self.calls = 0
+
+    def window_title(self):
+        self.calls += 1
+        return self.title
+
+
+# CachedFocusProvider Class:
+# Wraps another provider and only asks it again once the cached title is older than the TTL or
+# invalidate() was called.
+class CachedFocusProvider(object):
+
+    def __init__(self, provider, ttl=0.5):
+        """Constructor for the CachedFocusProvider class.
+
+        Args:
+        - provider: Object with a window_title() method.
+        - ttl (float, optional): Seconds a cached title stays valid. Default is 0.5.
+        """
+        self.provider = provider
+        self.ttl = ttl
+        self._title = None
+        self._expires = 0.0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def window_title(self):
+        now = _clock()
+        with self._lock:
+            if self._title is not None and now < self._expires:
+                self.hits += 1
+                return self._title
+            self.misses += 1
+            self._title = self.provider.window_title()
+            self._expires = now + self.ttl
+            return self._title
+
+    def invalidate(self):
+        """Forget the cached title, e.g. when a focus change is reported."""
+        with self._lock:
+            self._title = None
+
+    def is_active(self, title_fragment=GOOGLE_EARTH_TITLE):
+        """Check whether the foreground window title contains the given text."""
+        return title_fragment in self.window_title()
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return float(self.hits) / total if total else 0.0
+
+
+def default_provider(ttl=0.5):
+    """Cached Win32 provider on Windows, a fake that always reports Google Earth elsewhere."""
+    if win32gui is not None:
+        return CachedFocusProvider(Win32FocusProvider(), ttl)
+    return CachedFocusProvider(FakeFocusProvider(), ttl)
@@ -0,0 +1,107 @@
+'''
+Gesture dispatcher.
+The sensor recognizes swipes and circles for us. GestureDispatcher reads them incrementally with
+frame.gestures(sinceFrame), so gestures that happened on frames the listener skipped (for example
+while the idle governor thins out processing) are still seen, and acts on each gesture once, when it
+reaches STATE_STOP. Gesture ids already acted on are kept in a small bounded set, which keeps the
+cost per frame constant.
+
+Completed gestures are named ("swipe_left", "swipe_up", "circle_clockwise", ...) and looked up in a
+routing table that maps names to command tuples. The commands go into the same queue as the
+hotkey commands and run on the frame worker, see hotkeys.py.
+
+A circle drawn with the palm is also a shape for shapes.py. The dispatcher remembers when it last
+saw a circle gesture, so the listener can keep the shape recognizer from acting on the same motion.
+'''
+
+import collections
+
+try:
+    import Leap
+except ImportError:
+    import LeapEmulation as Leap  # No native SDK available, e.g. on Linux CI
+
+# Gesture name -> command. Only deliberate motions are routed; a slow hand slide is not a swipe,
+# but a quick sideways flick would be, so horizontal swipes are left unrouted by default.
+DEFAULT_ROUTES = {
+    "swipe_up": ("rotate",),
+    "circle_clockwise": ("behavior",),
+}
+
+
+def swipe_name(direction):
+    """Name a swipe after the main axis of its direction vector."""
+    x, y, z = direction.x, direction.y, direction.z
+    if abs(x) >= abs(y) and abs(x) >= abs(z):
+        return "swipe_right" if x > 0 else "swipe_left"
+    if abs(y) >= abs(z):
+        return "swipe_up" if y > 0 else "swipe_down"
+    return "swipe_back" if z > 0 else "swipe_forward"
+
+
+# GestureDispatcher Class:
+# Turns completed Leap gestures into queued commands.
+class GestureDispatcher(object):
+
+    def __init__(self, commands, routes=None, min_circle_turns=1.0, remember=64):
+        """Constructor for the GestureDispatcher class.
+
+        Args:
+        - commands (deque): Queue the routed commands are appended to.
+        - routes (dict, optional): Gesture name -> command tuple. Default is DEFAULT_ROUTES.
+        - min_circle_turns (float, optional): Turns a circle needs before it counts. Default is 1.
+        - remember (int, optional): Number of handled gesture ids kept for de-duplication. Default is 64.
+        """
+        self.commands = commands
+        self.routes = dict(DEFAULT_ROUTES if routes is None else routes)
+        self.min_circle_turns = min_circle_turns
+        self._last_frame = None
+        self._handled = set()
+        self._handled_order = collections.deque()
+        self._remember = remember
+        self.last_circle = None  # Timestamp of the newest frame with a circle gesture, in any state
+        self.seen = 0        # Gesture updates read
+        self.completed = 0   # Gestures that reached STATE_STOP
+        self.dispatched = 0  # Completed gestures that had a route
+
+    def process(self, frame):
+        """Read the gestures since the last processed frame and dispatch the completed ones."""
+        if self._last_frame is None:
+            gestures = frame.gestures()
+        else:
+            gestures = frame.gestures(self._last_frame)
+        self._last_frame = frame
+
+        for gesture in gestures:
+            self.seen += 1
+            if gesture.type == Leap.Gesture.TYPE_CIRCLE:
+                self.last_circle = frame.timestamp
+            if gesture.state != Leap.Gesture.STATE_STOP or gesture.id in self._handled:
+                continue
+            self._remember_id(gesture.id)
+            self.completed += 1
+            name = self.name(gesture)
+            command = self.routes.get(name)
+            if command:
+                self.dispatched += 1
+                self.commands.append(command)
+
+    def name(self, gesture):
+        """Name of a completed gesture, or None for gestures that are not routed by type."""
+        if gesture.type == Leap.Gesture.TYPE_SWIPE:
+            return swipe_name(Leap.SwipeGesture(gesture).direction)
+        if gesture.type == Leap.Gesture.TYPE_CIRCLE:
+            circle = Leap.CircleGesture(gesture)
+            if circle.progress < self.min_circle_turns:
+                return None
+            # Drawn clockwise, the normal points the same way as the finger drawing the circle. This holds
+            # whichever way the finger points, a fixed axis such as -z does not.
+            clockwise = circle.pointable.direction.angle_to(circle.normal) <= Leap.PI / 2
+            return "circle_clockwise" if clockwise else "circle_counterclockwise"
+        return None
+
+    def _remember_id(self, gesture_id):
+        self._handled.add(gesture_id)
+        self._handled_order.append(gesture_id)
+        if len(self._handled_order) > self._remember:
+            self._handled.discard(self._handled_order.popleft())
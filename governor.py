@@ -0,0 +1,120 @@
+'''
+Idle power governor.
+Nobody stands at the kiosk most of the time, yet every sensor frame used to go through hand
+extraction and the behaviors. IdleGovernor watches a cheap presence check (is the frame's hand list
+empty) and, after a sustained absence of hands, lets only every Nth frame through so timers and
+hotkeys keep working. The first frame with a hand in it switches back to full rate, so waking up
+never costs more than one frame.
+
+Controller.set_paused is not used: a paused service delivers no frames at all, so nothing could
+notice a hand coming back.
+
+The governor also keeps the wall and process CPU time spent in each state, from which it reports
+the idle duty cycle and an estimate of the CPU time saved.
+'''
+
+import os
+import time
+
+_clock = getattr(time, "monotonic", time.time)
+
+
+def _cpu_time():
+    """User plus system CPU seconds of this process, on Windows as well."""
+    times = os.times()
+    return times[0] + times[1]
+
+
+# IdleGovernor Class:
+# Decides per frame whether the full processing path runs.
+class IdleGovernor(object):
+
+    def __init__(self, idle_after=5.0, idle_every=10, clock=_clock, cpu_clock=_cpu_time):
+        """Constructor for the IdleGovernor class.
+
+        Args:
+        - idle_after (float, optional): Seconds without hands before going idle. Default is 5.
+        - idle_every (int, optional): While idle, one frame in this many is processed. Default is 10.
+        - clock (callable, optional): Monotonic wall clock.
+        - cpu_clock (callable, optional): Process CPU time clock.
+        """
+        self.idle_after = idle_after
+        self.idle_every = idle_every
+        self.clock = clock
+        self.cpu_clock = cpu_clock
+        self.idle = False
+        self.frames = 0
+        self.skipped = 0
+        self.wakeups = 0
+        self.active_time = 0.0
+        self.idle_time = 0.0
+        self.active_cpu = 0.0
+        self.idle_cpu = 0.0
+        now = clock()
+        self._last_hand = now
+        self._since = now
+        self._cpu_since = cpu_clock()
+        self._countdown = 0
+
+    def admit(self, hand_present):
+        """Called for every sensor frame after the presence check.
+
+        Args:
+        - hand_present (bool): True if the frame contains at least one hand.
+
+        Returns:
+        - bool: True if the frame should go through extraction and the behaviors.
+        """
+        self.frames += 1
+        now = self.clock()
+        if hand_present:
+            self._last_hand = now
+            if self.idle:
+                self._switch(False, now)
+                self.wakeups += 1
+            return True
+        if not self.idle:
+            if now - self._last_hand < self.idle_after:
+                return True
+            self._switch(True, now)
+            self._countdown = 0
+        self._countdown -= 1
+        if self._countdown < 0:
+            self._countdown = self.idle_every - 1
+            return True
+        self.skipped += 1
+        return False
+
+    def _switch(self, idle, now):
+        self._account(now)
+        self.idle = idle
+
+    def _account(self, now):
+        cpu = self.cpu_clock()
+        if self.idle:
+            self.idle_time += now - self._since
+            self.idle_cpu += cpu - self._cpu_since
+        else:
+            self.active_time += now - self._since
+            self.active_cpu += cpu - self._cpu_since
+        self._since = now
+        self._cpu_since = cpu
+
+    @property
+    def duty_cycle(self):
+        """Fraction of the time spent at full rate."""
+        self._account(self.clock())
+        total = self.active_time + self.idle_time
+        return self.active_time / total if total else 1.0
+
+    @property
+    def cpu_saved(self):
+        """Estimated CPU seconds saved: idle time at the active CPU rate minus the CPU actually used."""
+        self._account(self.clock())
+        if not self.active_time:
+            return 0.0
+        return max(0.0, self.idle_time * self.active_cpu / self.active_time - self.idle_cpu)
+
+    def report(self):
+        return "Active {:.0%} of the time, {} frames skipped while idle, {} wakeups, ~{:.1f} s CPU saved".format(
+            self.duty_cycle, self.skipped, self.wakeups, self.cpu_saved)
@@ -0,0 +1,144 @@
+'''
+Hand kinematics history.
+HandHistory is a preallocated NumPy ring buffer that keeps the last `capacity` frames of palm
+position, velocity, normal and direction for up to `max_hands` hands. It is filled once per frame
+from the hand snapshots, so smoothing, velocity and gesture code can work on whole windows of
+history at once instead of calling Controller.frame(history) and walking SWIG objects.
+
+Every entry is written twice, at i and i + capacity. Any window of up to `capacity` frames is then
+one contiguous slice, so windows are NumPy views and never copies. Because of that the history is
+not locked: append, clear and every reader must run on the same thread, the behavior worker.
+'''
+
+import numpy as np
+
+
+# HistoryWindow Class:
+# Views of the most recent frames, oldest first. Vector arrays have shape (frames, max_hands, 3);
+# slots without a hand hold NaN and a hand id of -1.
+class HistoryWindow(object):
+    __slots__ = ("timestamps", "frame_ids", "hand_counts", "hand_ids",
+                 "palm", "velocity", "normal", "direction")
+
+    def __init__(self, timestamps, frame_ids, hand_counts, hand_ids, palm, velocity, normal, direction):
+        self.timestamps = timestamps
+        self.frame_ids = frame_ids
+        self.hand_counts = hand_counts
+        self.hand_ids = hand_ids
+        self.palm = palm
+        self.velocity = velocity
+        self.normal = normal
+        self.direction = direction
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def mask(self, hand_id):
+        """Boolean (frames, max_hands) array that is True where the given hand is stored."""
+        return self.hand_ids == hand_id
+
+    def track(self, hand_id, field="palm"):
+        """Return (timestamps, values) for one hand over the window. This copies the selected rows.
+
+        Args:
+        - hand_id (int): Leap hand id.
+        - field (str, optional): "palm", "velocity", "normal" or "direction". Default is "palm".
+        """
+        rows, slots = np.nonzero(self.hand_ids == hand_id)
+        return self.timestamps[rows], getattr(self, field)[rows, slots]
+
+
+# HandHistory Class:
+# Fixed-capacity ring buffer of hand snapshots.
+class HandHistory(object):
+
+    def __init__(self, capacity=512, max_hands=2):
+        """Constructor for the HandHistory class.
+
+        Args:
+        - capacity (int, optional): Number of frames kept. Default is 512 (about 4 s at 120 fps).
+        - max_hands (int, optional): Hands stored per frame, extra hands are ignored. Default is 2.
+        """
+        self.capacity = capacity
+        self.max_hands = max_hands
+        size = 2 * capacity
+        self._timestamps = np.zeros(size, dtype=np.int64)
+        self._frame_ids = np.zeros(size, dtype=np.int64)
+        self._hand_counts = np.zeros(size, dtype=np.int8)
+        self._hand_ids = np.full((size, max_hands), -1, dtype=np.int64)
+        self._palm = np.full((size, max_hands, 3), np.nan)
+        self._velocity = np.full((size, max_hands, 3), np.nan)
+        self._normal = np.full((size, max_hands, 3), np.nan)
+        self._direction = np.full((size, max_hands, 3), np.nan)
+        self._row = np.empty((max_hands, 4, 3))  # Scratch space reused by append
+        self._next = 0   # Slot the next frame is written to, in [0, capacity)
+        self.count = 0   # Frames currently stored, at most capacity
+
+    def __len__(self):
+        return self.count
+
+    def append(self, frame):
+        """Store one frame of hand snapshots in O(1) time, reusing the preallocated arrays.
+
+        Args:
+        - frame (HandFrame): Hand snapshots of the current frame.
+        """
+        hands = frame.hands[:self.max_hands]
+        count = len(hands)
+        row = self._row
+        row.fill(np.nan)
+        ids = [-1] * self.max_hands
+        for slot, hand in enumerate(hands):
+            ids[slot] = hand.id
+            row[slot, 0] = (hand.palm_x, hand.palm_y, hand.palm_z)
+            row[slot, 1] = (hand.velocity_x, hand.velocity_y, hand.velocity_z)
+            row[slot, 2] = (hand.normal_x, hand.normal_y, hand.normal_z)
+            row[slot, 3] = (hand.direction_x, hand.direction_y, hand.direction_z)
+
+        for index in (self._next, self._next + self.capacity):
+            self._timestamps[index] = frame.timestamp
+            self._frame_ids[index] = frame.id
+            self._hand_counts[index] = count
+            self._hand_ids[index] = ids
+            self._palm[index] = row[:, 0]
+            self._velocity[index] = row[:, 1]
+            self._normal[index] = row[:, 2]
+            self._direction[index] = row[:, 3]
+
+        self._next = (self._next + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def clear(self):
+        self._next = 0
+        self.count = 0
+
+    def last(self, frames):
+        """Return a HistoryWindow view of the most recent frames (at most capacity)."""
+        frames = min(frames, self.count)
+        end = self._next + self.capacity
+        window = slice(end - frames, end)
+        return HistoryWindow(self._timestamps[window], self._frame_ids[window],
+                             self._hand_counts[window], self._hand_ids[window],
+                             self._palm[window], self._velocity[window],
+                             self._normal[window], self._direction[window])
+
+    def since(self, timestamp):
+        """Return a HistoryWindow view of the frames at or after the given timestamp (microseconds)."""
+        end = self._next + self.capacity
+        stored = self._timestamps[end - self.count:end]
+        first = int(np.searchsorted(stored, timestamp, side="left"))
+        return self.last(self.count - first)
+
+    def window(self, seconds):
+        """Return a HistoryWindow view of the last `seconds` of history, e.g. window(0.2) for 200 ms."""
+        if not self.count:
+            return self.last(0)
+        return self.since(self.latest - int(seconds * 1e6))
+
+    @property
+    def latest(self):
+        """Timestamp of the newest frame in microseconds, or None if empty."""
+        if not self.count:
+            return None
+        return int(self._timestamps[self._next + self.capacity - 1])
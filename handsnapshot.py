@@ -0,0 +1,119 @@
+'''
+Per-frame hand snapshots.
+Every attribute read on a Leap.Hand or Leap.Vector is a call into the native SWIG module. The
+HandExtractor reads each hand in a frame exactly once, on the SDK callback thread, and copies the
+values the pipeline reads into plain floats on a small __slots__ object. The hand history, filters,
+tracker and behaviors then read the snapshot on the worker thread without touching the SDK.
+
+Only fields something downstream reads are copied: the palm position, velocity, normal and
+direction all feed the history and the filters, is_left the tracker. Hand confidence is not read
+anywhere and is left out. Leap.Vector.to_tuple() is plain Python over the x, y and z getters, so a
+vector costs 4 native calls and a hand 19. HandExtractor counts these calls per frame.
+
+Pitch, roll and yaw are derived from the copied vectors in Python using the same formulas as the
+Leap SDK, so they cost no extra native calls.
+'''
+
+import math
+
+# Native calls made per hand: hands[i], id, is_left, and four vectors (getter + x, y, z)
+NATIVE_CALLS_PER_HAND = 3 + 4 * 4
+# Native calls made per frame: id, timestamp, hands, len(hands)
+NATIVE_CALLS_PER_FRAME = 4
+
+
+# HandSnapshot Class:
+# Plain copy of one Leap.Hand. Positions are in millimeters, angles in radians.
+class HandSnapshot(object):
+    __slots__ = (
+        "id", "is_left",
+        "palm_x", "palm_y", "palm_z",
+        "velocity_x", "velocity_y", "velocity_z",
+        "normal_x", "normal_y", "normal_z",
+        "direction_x", "direction_y", "direction_z",
+        "pitch", "roll", "yaw",
+    )
+
+    def __init__(self, hand_id=0, is_left=False, palm=(0.0, 0.0, 0.0), velocity=(0.0, 0.0, 0.0),
+                 normal=(0.0, -1.0, 0.0), direction=(0.0, 0.0, -1.0)):
+        """Constructor for the HandSnapshot class.
+
+        Args:
+        - hand_id (int, optional): Leap hand id.
+        - is_left (bool, optional): True for a left hand.
+        - palm, velocity, normal, direction (tuple, optional): (x, y, z) vectors.
+        """
+        self.id = hand_id
+        self.is_left = is_left
+        self.palm_x, self.palm_y, self.palm_z = palm
+        self.velocity_x, self.velocity_y, self.velocity_z = velocity
+        self.normal_x, self.normal_y, self.normal_z = normal
+        self.direction_x, self.direction_y, self.direction_z = direction
+        self.pitch = math.atan2(self.direction_y, -self.direction_z)
+        self.yaw = math.atan2(self.direction_x, -self.direction_z)
+        self.roll = math.atan2(self.normal_x, -self.normal_y)
+
+    @classmethod
+    def from_hand(cls, hand):
+        """Copy a Leap.Hand into a new snapshot."""
+        return cls(hand.id, hand.is_left, hand.palm_position.to_tuple(), hand.palm_velocity.to_tuple(),
+                   hand.palm_normal.to_tuple(), hand.direction.to_tuple())
+
+    @property
+    def palm_position(self):
+        return (self.palm_x, self.palm_y, self.palm_z)
+
+    def __repr__(self):
+        return "HandSnapshot(id={}, palm=({:.1f}, {:.1f}, {:.1f}))".format(
+            self.id, self.palm_x, self.palm_y, self.palm_z)
+
+
+# HandFrame Class:
+# The snapshots taken from one Leap.Frame. Behaviors receive this instead of the SWIG frame.
+class HandFrame(object):
+    __slots__ = ("id", "timestamp", "hands")
+
+    def __init__(self, frame_id, timestamp, hands):
+        self.id = frame_id
+        self.timestamp = timestamp  # Microseconds, as reported by Leap.Frame.timestamp
+        self.hands = hands
+
+    def hand(self, hand_id):
+        """Return the snapshot with the given hand id, or None."""
+        for hand in self.hands:
+            if hand.id == hand_id:
+                return hand
+        return None
+
+
+# HandExtractor Class:
+# Builds a HandFrame from a Leap.Frame and keeps count of the native calls involved.
+class HandExtractor(object):
+
+    def __init__(self):
+        self.frames = 0
+        self.native_calls = 0
+
+    def extract(self, frame):
+        """Take snapshots of every hand in a Leap.Frame.
+
+        Args:
+        - frame: The frame data from the UltraLeap device.
+
+        Returns:
+        - HandFrame: Snapshots of the hands in the frame.
+        """
+        leap_hands = frame.hands
+        count = len(leap_hands)
+        hands = [HandSnapshot.from_hand(leap_hands[i]) for i in range(count)]
+
+        self.frames += 1
+        self.native_calls += NATIVE_CALLS_PER_FRAME + count * NATIVE_CALLS_PER_HAND
+
+        return HandFrame(frame.id, frame.timestamp, hands)
+
+    def calls_per_frame(self):
+        """Average native calls made per extracted frame so far."""
+        if not self.frames:
+            return 0.0
+        return float(self.native_calls) / self.frames
@@ -0,0 +1,79 @@
+'''
+Operator hotkeys.
+Hotkeys are registered once as keyboard hooks instead of being polled with keyboard.is_pressed on
+every frame. A hook only appends a command tuple to a queue, shared with the gesture dispatcher;
+the frame worker drains the queue before it runs the behaviors, so commands are carried out on the
+same thread as everything else. Key repeat is ignored, a command fires once per key press.
+
+Commands are tuples whose first item names the command:
+- ("planet", name): switch Google Earth to "Earth", "Mars" or "Moon"
+- ("rotate",): switch to the next planet
+- ("home",): fly to the Arizona Science Center
+- ("behavior",): switch to the next behavior
+- ("recalibrate",): forget hand history and filter state
+- ("record",): start or stop recording frames
+- ("timer", callback): run a due TimerWheel callback, see timers.py
+'''
+
+import collections
+import threading
+
+import keyboard
+
+DEFAULT_HOTKEYS = {
+    "m": ("planet", "Mars"),
+    "l": ("planet", "Moon"),
+    "e": ("planet", "Earth"),
+    "f6": ("behavior",),
+    "f7": ("recalibrate",),
+    "f8": ("record",),
+}
+
+
+# HotkeyListener Class:
+# Registers keyboard hooks that push commands into a queue.
+class HotkeyListener(object):
+
+    def __init__(self, bindings=None, commands=None, hook_key=None, unhook=None):
+        """Constructor for the HotkeyListener class.
+
+        Args:
+        - bindings (dict, optional): Key name -> command tuple. Default is DEFAULT_HOTKEYS.
+        - commands (deque, optional): Queue the commands are appended to. A new one is created by default.
+        - hook_key, unhook (callable, optional): Hook functions. Default is keyboard.hook_key and keyboard.unhook.
+        """
+        self.bindings = dict(DEFAULT_HOTKEYS if bindings is None else bindings)
+        self.commands = collections.deque() if commands is None else commands
+        self._hook_key = hook_key or keyboard.hook_key
+        self._unhook = unhook or keyboard.unhook
+        self._hooks = []
+        self._held = set()
+        self._lock = threading.Lock()
+        self.pressed = 0
+
+    def start(self):
+        """Register one hook per bound key."""
+        if self._hooks:
+            return
+        for key in self.bindings:
+            self._hooks.append(self._hook_key(key, lambda event, key=key: self._on_event(key, event)))
+
+    def stop(self):
+        for hook in self._hooks:
+            self._unhook(hook)
+        self._hooks = []
+        self._held.clear()
+
+    def _on_event(self, key, event):
+        """Runs on the keyboard hook thread. Must return quickly."""
+        with self._lock:
+            if event.event_type == keyboard.KEY_UP:
+                self._held.discard(key)
+                return
+            if key in self._held:
+                return  # Auto-repeat of a held key
+            self._held.add(key)
+        command = self.bindings.get(key)
+        if command:
+            self.pressed += 1
+            self.commands.append(command)
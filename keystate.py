@@ -0,0 +1,82 @@
+'''
+Edge-triggered key state tracking.
+KeyState remembers which keys this program is holding down and only sends an OS key event when a
+key actually changes state. Repeating the same press or release on every frame becomes free.
+'''
+
+import threading
+
+import keyboard
+
+
+# KeyState Class:
+# Central record of held keys shared by the behaviors and the actuator thread.
+class KeyState(object):
+
+    def __init__(self, press=keyboard.press, release=keyboard.release):
+        """Constructor for the KeyState class.
+
+        Args:
+        - press (callable, optional): Function that sends a key down event. Default is keyboard.press.
+        - release (callable, optional): Function that sends a key up event. Default is keyboard.release.
+        """
+        self._press = press
+        self._release = release
+        self._held = set()
+        self._lock = threading.Lock()
+        self.events_sent = 0
+        self.events_skipped = 0
+
+    def press(self, key):
+        """Press a key unless it is already held.
+
+        Returns:
+        - bool: True if an OS event was sent.
+        """
+        return self.set(key, True)
+
+    def release(self, key):
+        """Release a key unless it is already up.
+
+        Returns:
+        - bool: True if an OS event was sent.
+        """
+        return self.set(key, False)
+
+    def set(self, key, down):
+        """Bring a key to the requested state, sending an event only on a change.
+
+        Args:
+        - key (str): Key name as understood by the keyboard module.
+        - down (bool): True to hold the key, False to release it.
+
+        Returns:
+        - bool: True if an OS event was sent.
+        """
+        with self._lock:
+            if (key in self._held) == down:
+                self.events_skipped += 1
+                return False
+            if down:
+                self._press(key)
+                self._held.add(key)
+            else:
+                self._release(key)
+                self._held.discard(key)
+            self.events_sent += 1
+            return True
+
+    def release_all(self, keys=None):
+        """Release the given keys, or every held key if none are given."""
+        if keys is None:
+            with self._lock:
+                keys = list(self._held)
+        for key in keys:
+            self.release(key)
+
+    def is_held(self, key):
+        return key in self._held
+
+    @property
+    def held(self):
+        return frozenset(self._held)
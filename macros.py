@@ -0,0 +1,211 @@
+'''
+Asynchronous UI macros.
+Long Google Earth interactions, like typing a search or clicking through the planet menu, are
+described as lists of Steps and run by a MacroRunner on its own thread. The frame loop keeps running
+meanwhile; behaviors check MacroRunner.busy and hold back movement output while a macro owns the UI.
+
+Each step runs an action and then waits, either for a fixed delay or until a condition holds (for
+example the UI state confirming a planet switch) with a timeout. Macros are queued by priority, a
+higher priority macro preempts a running lower priority one, and any macro can be cancelled.
+Callers that should not pile up macros check busy_at(priority), which ignores the lower priority
+macros a new submission would preempt anyway.
+
+Replay sets MacroRunner.inline, which runs each macro to its end inside submit() on the caller's
+thread, so the frames that follow always see the same UI state regardless of playback speed. Inline
+macros skip their waits: a replay has no live UI to wait for, and waiting on the wall clock would
+stall the replay and make it depend on the desktop it runs on.
+'''
+
+import heapq
+import itertools
+import threading
+import time
+import traceback
+
+_clock = getattr(time, "monotonic", time.time)
+
+
+# Step Class:
+# One action followed by a wait.
+class Step(object):
+    __slots__ = ("action", "until", "timeout", "poll")
+
+    def __init__(self, action=None, until=None, timeout=0.0, poll=0.02):
+        """Constructor for the Step class.
+
+        Args:
+        - action (callable, optional): Called without arguments when the step starts.
+        - until (callable, optional): Condition to wait for after the action. Without it the step
+          simply waits for `timeout` seconds.
+        - timeout (float, optional): Longest wait in seconds. Default is 0.
+        - poll (float, optional): Seconds between condition checks. Default is 0.02.
+        """
+        self.action = action
+        self.until = until
+        self.timeout = timeout
+        self.poll = poll
+
+
+def wait(seconds):
+    """Step that only waits."""
+    return Step(timeout=seconds)
+
+
+# Macro Class:
+# A named list of steps. Also serves as the handle returned by MacroRunner.submit.
+class Macro(object):
+
+    def __init__(self, name, steps, priority=0):
+        self.name = name
+        self.steps = list(steps)
+        self.priority = priority
+        self.cancelled = False
+        self.finished = threading.Event()
+        self.timed_out_steps = 0
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        """Stop the macro before its next step, or immediately if it is waiting."""
+        self.cancelled = True
+        self._cancel.set()
+
+    def wait(self, timeout=None):
+        """Block until the macro finished or was cancelled."""
+        return self.finished.wait(timeout)
+
+    def _run(self, waits=True):
+        for step in self.steps:
+            if self.cancelled:
+                return
+            if step.action:
+                step.action()
+            if not waits:
+                continue
+            if step.until is None:
+                if step.timeout > 0:
+                    self._cancel.wait(step.timeout)
+                continue
+            deadline = _clock() + step.timeout
+            while not step.until():
+                if self.cancelled:
+                    return
+                remaining = deadline - _clock()
+                if remaining <= 0:
+                    self.timed_out_steps += 1
+                    break
+                self._cancel.wait(min(step.poll, remaining))
+
+    def __repr__(self):
+        return "Macro({!r}, {} steps, priority={})".format(self.name, len(self.steps), self.priority)
+
+
+# MacroRunner Class:
+# Runs one macro at a time on a worker thread, highest priority first.
+class MacroRunner(object):
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._queue = []   # Heap of (-priority, order, macro)
+        self._order = itertools.count()
+        self._current = None
+        self._running = False
+        self._thread = None
+        self.inline = False  # Run macros on the submitting thread without waits, see the module docstring
+        self.completed = 0
+        self.cancelled = 0
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="MacroRunner")
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self, timeout=2.0):
+        """Cancel everything and stop the worker thread."""
+        with self._cond:
+            if not self._running:
+                return
+            self._running = False
+            self.cancel_all()
+            self._cond.notify()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def submit(self, macro):
+        """Queue a macro. A running macro with a lower priority is cancelled to make room.
+
+        Returns:
+        - Macro: The submitted macro, usable as a handle.
+        """
+        if self.inline:
+            with self._cond:
+                self._current = macro
+            self._execute(macro)
+            return macro
+        if not self._running:
+            self.start()
+        with self._cond:
+            current = self._current
+            if current is not None and macro.priority > current.priority:
+                current.cancel()
+            heapq.heappush(self._queue, (-macro.priority, next(self._order), macro))
+            self._cond.notify()
+        return macro
+
+    def run(self, name, steps, priority=0):
+        """Build a Macro from steps and submit it."""
+        return self.submit(Macro(name, steps, priority))
+
+    def cancel_all(self):
+        with self._cond:
+            for _, _, macro in self._queue:
+                macro.cancel()
+                macro.finished.set()
+            self._queue = []
+            if self._current is not None:
+                self._current.cancel()
+
+    @property
+    def busy(self):
+        """True while a macro is running or waiting to run."""
+        return self._current is not None or bool(self._queue)
+
+    def busy_at(self, priority):
+        """True while a macro of at least the given priority is running or waiting to run."""
+        with self._cond:
+            current = self._current
+            if current is not None and not current.cancelled and current.priority >= priority:
+                return True
+            return any(-queued >= priority for queued, _, _ in self._queue)
+
+    @property
+    def current(self):
+        return self._current
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and not self._queue:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                _, _, macro = heapq.heappop(self._queue)
+                self._current = macro
+            self._execute(macro)
+
+    def _execute(self, macro):
+        try:
+            macro._run(waits=not self.inline)
+        except Exception:
+            traceback.print_exc()
+        finally:
+            with self._cond:
+                self._current = None
+            if macro.cancelled:
+                self.cancelled += 1
+            else:
+                self.completed += 1
+            macro.finished.set()
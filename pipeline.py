@@ -0,0 +1,123 @@
+'''
+Frame pipeline between the Leap callback and behavior execution.
+The SDK callback thread only posts the newest hand snapshot into a single-slot FrameMailbox. A
+FrameWorker thread takes from the mailbox and runs the behaviors. If the worker is still busy when
+new frames arrive, older unprocessed frames are overwritten and counted as dropped, so the worker
+always acts on the freshest hand data instead of working through a backlog.
+
+Replay needs every frame handled, in order, to give the same result on every run. An inline
+FrameWorker runs the handler on the posting thread instead, so nothing is dropped and the player
+waits for each frame to be processed.
+'''
+
+import threading
+import traceback
+
+
+# FrameMailbox Class:
+# Bounded single-slot mailbox. put() never blocks, the newest item wins.
+class FrameMailbox(object):
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self._full = False
+        self._closed = False
+        self.posted = 0
+        self.dropped = 0
+
+    def put(self, item):
+        """Post an item, replacing one that has not been taken yet."""
+        with self._cond:
+            if self._full:
+                self.dropped += 1
+            self._item = item
+            self._full = True
+            self.posted += 1
+            self._cond.notify()
+
+    def take(self, timeout=None):
+        """Wait for the next item.
+
+        Returns:
+        - The newest item, or None if the mailbox was closed or the timeout expired.
+        """
+        with self._cond:
+            if not self._full and not self._closed:
+                self._cond.wait(timeout)
+            if not self._full:
+                return None
+            item, self._item = self._item, None
+            self._full = False
+            return item
+
+    def close(self):
+        """Wake any waiting taker and make further take() calls return immediately."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+
+# FrameWorker Class:
+# Thread that feeds mailbox items to a handler one at a time.
+class FrameWorker(object):
+
+    def __init__(self, handler, mailbox=None, name="FrameWorker", inline=False):
+        """Constructor for the FrameWorker class.
+
+        Args:
+        - handler (callable): Called with each item taken from the mailbox.
+        - mailbox (FrameMailbox, optional): Mailbox to read from. A new one is created by default.
+        - name (str, optional): Thread name.
+        - inline (bool, optional): Run the handler inside post() instead of on a thread, so no item is
+          dropped, e.g. for replay. Default is False.
+        """
+        self.handler = handler
+        self.mailbox = mailbox or FrameMailbox()
+        self.name = name
+        self.inline = inline
+        self.processed = 0
+        self.errors = 0
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None or self.inline:
+            return
+        self._thread = threading.Thread(target=self._run, name=self.name)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        """Close the mailbox and wait for the current and the pending item to finish."""
+        self.mailbox.close()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def post(self, item):
+        if self.inline:
+            self._handle(item)
+        else:
+            self.mailbox.put(item)
+
+    def _run(self):
+        while True:
+            item = self.mailbox.take()
+            if item is None:
+                if self.mailbox.closed:
+                    return  # Closed and nothing left to process
+                continue
+            self._handle(item)
+
+    def _handle(self, item):
+        try:
+            self.handler(item)
+        except Exception:
+            # Keep the worker alive, a single bad frame must not stop control
+            self.errors += 1
+            traceback.print_exc()
+        self.processed += 1
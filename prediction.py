@@ -0,0 +1,205 @@
+'''
+Predictive latency compensation.
+Between a hand movement and Google Earth reacting there is the SDK latency, the time it takes to
+inject input events and Earth's own render latency. PosePredictor moves every hand forward in time
+by that latency budget, so behaviors act on where the hand will be rather than where it was.
+
+The palm is extrapolated with a blend of the sensor's palm velocity and a least-squares slope over
+the last few frames of HandHistory; the normal and direction only with the history slope. Overshoot
+is bounded: slow hands are not extrapolated at all, the lead is capped, and no lead is applied
+when the sensor velocity and the recent slope disagree, i.e. when the hand is turning around.
+
+The predictor can be checked against a recording, which replays the session and compares the
+predicted palm position with the position actually recorded one horizon later:
+
+    python prediction.py session.leaprec 60
+'''
+
+import sys
+
+import numpy as np
+
+from handhistory import HandHistory
+from handsnapshot import HandExtractor, HandFrame, HandSnapshot
+
+
+# PosePredictor Class:
+# Extrapolates hand snapshots by a latency budget.
+class PosePredictor(object):
+
+    def __init__(self, latency=0.05, window=0.05, history_weight=0.5, min_speed=30.0,
+                 max_lead=25.0, max_turn=0.2, max_horizon=0.15):
+        """Constructor for the PosePredictor class.
+
+        Args:
+        - latency (float, optional): Fixed part of the budget in seconds, input injection plus render latency. Default is 0.05.
+        - window (float, optional): Seconds of history used for the slope. Default is 0.05.
+        - history_weight (float, optional): Weight of the history slope against the sensor velocity for the palm. Default is 0.5.
+        - min_speed (float, optional): Palm speed in mm/s below which nothing is extrapolated. Default is 30.
+        - max_lead (float, optional): Longest palm extrapolation in millimeters. Default is 25.
+        - max_turn (float, optional): Largest change of the unit normal and direction vectors. Default is 0.2.
+        - max_horizon (float, optional): Upper bound of the total horizon in seconds. Default is 0.15.
+        """
+        self.latency = latency
+        self.window = window
+        self.history_weight = history_weight
+        self.min_speed = min_speed
+        self.max_lead = max_lead
+        self.max_turn = max_turn
+        self.max_horizon = max_horizon
+        self.measured_latency = 0.0  # Smoothed SDK latency reported through observe_latency
+        self.frames = 0
+        self.clamped = 0
+        self.held_back = 0
+        self._lead_sum = 0.0
+
+    def observe_latency(self, seconds, smoothing=0.05):
+        """Fold a measured latency, e.g. Controller.now() minus frame.timestamp, into the budget."""
+        self.measured_latency += smoothing * (max(0.0, seconds) - self.measured_latency)
+
+    @property
+    def horizon(self):
+        """Total extrapolation time in seconds."""
+        return min(self.latency + self.measured_latency, self.max_horizon)
+
+    @property
+    def mean_lead(self):
+        """Average palm extrapolation per predicted hand, in millimeters."""
+        return self._lead_sum / self.frames if self.frames else 0.0
+
+    def _slopes(self, history, hand_id):
+        """Least-squares rate of change of palm, normal and direction over the history window, or None."""
+        if history is None or not len(history):
+            return None
+        window = history.window(self.window)
+        rows, slots = np.nonzero(window.hand_ids == hand_id)
+        if len(rows) < 3:
+            return None
+        t = window.timestamps[rows] * 1e-6
+        t = t - t.mean()
+        denominator = np.dot(t, t)
+        if denominator <= 0.0:
+            return None
+        values = np.concatenate((window.palm[rows, slots], window.normal[rows, slots],
+                                 window.direction[rows, slots]), axis=1)
+        return np.dot(t, values - values.mean(axis=0)) / denominator
+
+    def predict(self, hand, history=None, extra=0.0):
+        """Extrapolate one HandSnapshot.
+
+        Args:
+        - hand (HandSnapshot): Current hand.
+        - history (HandHistory, optional): Recent frames including the current one.
+        - extra (float, optional): Latency already present in the input, e.g. from smoothing, in seconds.
+
+        Returns:
+        - HandSnapshot: The predicted hand, or the input if nothing is extrapolated.
+        """
+        horizon = min(self.horizon + extra, self.max_horizon)
+        velocity = np.array((hand.velocity_x, hand.velocity_y, hand.velocity_z))
+        slopes = self._slopes(history, hand.id)
+        self.frames += 1
+
+        palm_rate = velocity
+        if slopes is not None:
+            if np.dot(velocity, slopes[0:3]) < 0.0:
+                self.held_back += 1  # Turning around, any lead would overshoot
+                return hand
+            palm_rate = (1.0 - self.history_weight) * velocity + self.history_weight * slopes[0:3]
+        if np.linalg.norm(palm_rate) < self.min_speed:
+            return hand
+
+        lead = palm_rate * horizon
+        length = np.linalg.norm(lead)
+        if length > self.max_lead:
+            lead *= self.max_lead / length
+            length = self.max_lead
+            self.clamped += 1
+        self._lead_sum += length
+
+        normal = np.array((hand.normal_x, hand.normal_y, hand.normal_z))
+        direction = np.array((hand.direction_x, hand.direction_y, hand.direction_z))
+        if slopes is not None:
+            normal += np.clip(slopes[3:6] * horizon, -self.max_turn, self.max_turn)
+            direction += np.clip(slopes[6:9] * horizon, -self.max_turn, self.max_turn)
+
+        palm = np.array((hand.palm_x, hand.palm_y, hand.palm_z)) + lead
+        return HandSnapshot(hand.id, hand.is_left, tuple(palm), tuple(velocity),
+                            tuple(normal), tuple(direction))
+
+    def apply(self, frame, history=None, extra=0.0):
+        """Extrapolate every hand of a HandFrame.
+
+        Returns:
+        - HandFrame: New frame with the predicted hands.
+        """
+        if not frame.hands:
+            return frame
+        return HandFrame(frame.id, frame.timestamp,
+                         [self.predict(hand, history, extra) for hand in frame.hands])
+
+
+def evaluate(frames, predictor, capacity=512):
+    """Replay HandFrames through a predictor and compare against what actually happened.
+
+    Args:
+    - frames (iterable): HandFrames in time order, e.g. extracted from a recording.
+    - predictor (PosePredictor): Predictor to test. Its current horizon is used for the comparison.
+
+    Returns:
+    - dict: Mean palm error in millimeters one horizon ahead, for the prediction ("predicted") and
+      for using the current position unchanged ("baseline"), and the number of samples compared.
+    """
+    history = HandHistory(capacity)
+    horizon = int(predictor.horizon * 1e6)
+    tracks = {}  # Hand id -> lists of timestamps, actual and predicted palm positions
+    for frame in frames:
+        history.append(frame)
+        for hand in frame.hands:
+            predicted = predictor.predict(hand, history)
+            track = tracks.setdefault(hand.id, ([], [], []))
+            track[0].append(frame.timestamp)
+            track[1].append(hand.palm_position)
+            track[2].append(predicted.palm_position)
+
+    errors, baseline = [], []
+    for timestamps, actual, predicted in tracks.values():
+        timestamps = np.array(timestamps, dtype=float)
+        actual = np.array(actual)
+        predicted = np.array(predicted)
+        # Only compare where the hand was still tracked one horizon later
+        usable = timestamps + horizon <= timestamps[-1]
+        if not usable.any():
+            continue
+        targets = timestamps[usable] + horizon
+        future = np.column_stack([np.interp(targets, timestamps, actual[:, axis]) for axis in range(3)])
+        errors.append(np.linalg.norm(predicted[usable] - future, axis=1))
+        baseline.append(np.linalg.norm(actual[usable] - future, axis=1))
+
+    if not errors:
+        return {"predicted": 0.0, "baseline": 0.0, "samples": 0}
+    errors = np.concatenate(errors)
+    baseline = np.concatenate(baseline)
+    return {"predicted": float(errors.mean()), "baseline": float(baseline.mean()), "samples": len(errors)}
+
+
+def main(argv):
+    from recording import FramePlayer
+
+    if len(argv) < 2:
+        print("Usage: python prediction.py RECORDING [LATENCY_MS]")
+        return
+    latency = float(argv[2]) / 1000.0 if len(argv) > 2 else 0.05
+    player = FramePlayer(argv[1])
+    extractor = HandExtractor()
+    try:
+        frames = (extractor.extract(frame) for _, frame in player.frames(speed=0))
+        result = evaluate(frames, PosePredictor(latency=latency))
+    finally:
+        player.close()
+    print("{} samples, {:.0f} ms ahead: {:.2f} mm error predicted, {:.2f} mm without prediction".format(
+        result["samples"], latency * 1e3, result["predicted"], result["baseline"]))
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,318 @@
+'''
+Frame recording and replay.
+FrameRecorder appends every Leap.Frame it is given to an append-only file using the SDK's own
+Frame.serialize format. The frame callback only appends the frame handle to a queue; serializing
+and writing happen on a background thread through buffers that are reused for the whole session.
+
+FramePlayer memory-maps a recording and feeds it back through a Leap.Listener, so behaviors can be
+exercised without a sensor attached.
+
+File layout:
+- 8 byte header: FILE_MAGIC
+- One record per frame: int64 timestamp (microseconds), uint32 length, then `length` bytes of serialized frame
+'''
+
+import bisect
+import collections
+import ctypes
+import mmap
+import struct
+import threading
+import time
+from array import array
+
+try:
+    import Leap
+except ImportError:
+    import LeapEmulation as Leap  # No native SDK available, e.g. on Linux CI
+
+FILE_MAGIC = b"LEAPREC1"
+RECORD_HEADER = struct.Struct("<qI")
+
+_clock = getattr(time, "monotonic", time.time)
+
+
+def _address(array):
+    """Return the memory address behind a Leap.byte_array."""
+    pointer = array.cast()
+    try:
+        return pointer.__long__()
+    except AttributeError:
+        return int(pointer)
+
+
+# FrameRecorder Class:
+# Writes serialized frames to disk on its own thread.
+class FrameRecorder(object):
+
+    def __init__(self, path, flush_interval=0.25, max_pending=4096):
+        """Constructor for the FrameRecorder class.
+
+        Args:
+        - path (str): File to append the recording to. A header is written if the file is new.
+        - flush_interval (float, optional): Seconds between background writes. Default is 0.25.
+        - max_pending (int, optional): Frames kept waiting for the writer before the oldest are dropped. Default is 4096.
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = collections.deque()
+        self._frame_buffer = Leap.byte_array(16384)
+        self._frame_capacity = 16384
+        self._write_buffer = bytearray(1 << 20)
+        self._file = None
+        self._thread = None
+        self._running = False
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.bytes_written = 0
+
+    def start(self):
+        """Open the file and start the writer thread."""
+        if self._running:
+            return
+        self._file = open(self.path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(FILE_MAGIC)
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="FrameRecorder")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Write out everything still queued and close the file."""
+        if not self._running:
+            return
+        self._running = False
+        self._thread.join()
+        self._thread = None
+        self._file.close()
+        self._file = None
+
+    def record(self, frame):
+        """Queue a frame for writing. Safe to call from the Leap frame callback.
+
+        Args:
+        - frame: The frame data from the UltraLeap device.
+        """
+        if len(self._pending) >= self.max_pending:
+            self.frames_dropped += 1
+            return
+        self._pending.append(frame)
+
+    # Writer thread
+
+    def _run(self):
+        while self._running:
+            time.sleep(self.flush_interval)
+            self._drain()
+        self._drain()
+
+    def _drain(self):
+        used = 0
+        while self._pending:
+            frame = self._pending.popleft()
+            length = frame.serialize_length
+            if length > self._frame_capacity:
+                self._frame_capacity = max(length, self._frame_capacity * 2)
+                self._frame_buffer = Leap.byte_array(self._frame_capacity)
+            Leap.LeapPython.Frame_serialize(frame, self._frame_buffer)
+
+            size = RECORD_HEADER.size + length
+            if used + size > len(self._write_buffer):
+                self._flush(used)
+                used = 0
+                if size > len(self._write_buffer):
+                    self._write_buffer = bytearray(size)
+
+            RECORD_HEADER.pack_into(self._write_buffer, used, frame.timestamp, length)
+            used += RECORD_HEADER.size
+            ctypes.memmove((ctypes.c_char * length).from_buffer(self._write_buffer, used),
+                           _address(self._frame_buffer), length)
+            used += length
+            self.frames_written += 1
+        self._flush(used)
+
+    def _flush(self, used):
+        if used:
+            self._file.write(memoryview(self._write_buffer)[:used])
+            self._file.flush()
+            self.bytes_written += used
+
+
+# LeapFrameDecoder Class:
+# Turns a recorded record back into a Leap.Frame, copying it once into a reused byte_array.
+class LeapFrameDecoder(object):
+
+    def __init__(self):
+        self._capacity = 16384
+        self._buffer = Leap.byte_array(self._capacity)
+
+    def __call__(self, mapped, offset, length):
+        """Deserialize the record stored at mapped[offset:offset + length]."""
+        if length > self._capacity:
+            self._capacity = max(length, self._capacity * 2)
+            self._buffer = Leap.byte_array(self._capacity)
+        source = (ctypes.c_char * length).from_buffer(mapped, offset)
+        ctypes.memmove(_address(self._buffer), ctypes.addressof(source), length)
+        del source
+        frame = Leap.Frame()
+        Leap.LeapPython.Frame_deserialize(frame, self._buffer, length)
+        return frame
+
+
+# ReplayController Class:
+# Stands in for Leap.Controller while a recording is played back.
+class ReplayController(object):
+
+    def __init__(self, history=60, invalid_frame=None):
+        """Constructor for the ReplayController class.
+
+        Args:
+        - history (int, optional): Number of past frames available through frame(history). Default is 60.
+        - invalid_frame (optional): Returned when a frame older than the kept history is requested.
+        """
+        self._frames = collections.deque(maxlen=history)
+        self._gestures = set()
+        self._paused = False
+        self.invalid_frame = invalid_frame
+        self.timestamp = 0
+
+    def push(self, frame, timestamp):
+        self._frames.append(frame)
+        self.timestamp = timestamp
+
+    def frame(self, history=0):
+        if history >= len(self._frames):
+            return self.invalid_frame
+        return self._frames[-1 - history]
+
+    def enable_gesture(self, type, enable=True):
+        if enable:
+            self._gestures.add(type)
+        else:
+            self._gestures.discard(type)
+
+    def is_gesture_enabled(self, type):
+        return type in self._gestures
+
+    def set_paused(self, pause):
+        self._paused = pause
+
+    def is_paused(self):
+        return self._paused
+
+    def now(self):
+        return self.timestamp
+
+    def clock(self):
+        """Frame clock: timestamp of the current frame in seconds. Replay runs timers and the idle governor on it."""
+        return self.timestamp * 1e-6
+
+
+# FramePlayer Class:
+# Walks a memory-mapped recording in place. The index holds one timestamp and offset per frame.
+class FramePlayer(object):
+
+    def __init__(self, path, decode=None):
+        """Constructor for the FramePlayer class.
+
+        Args:
+        - path (str): Recording written by FrameRecorder.
+        - decode (callable, optional): Called with (mapped, offset, length) to build a frame from a
+          record. Default deserializes a Leap.Frame.
+        """
+        self._file = open(path, "rb")
+        # ACCESS_COPY keeps the file untouched but gives ctypes a writable view of the mapping
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_COPY)
+        if self._map[:len(FILE_MAGIC)] != FILE_MAGIC:
+            self.close()
+            raise ValueError("'{}' is not a frame recording.".format(path))
+        self.decode = decode or LeapFrameDecoder()
+        # Doubles hold integers exactly up to 2**53 and are available on every Python version
+        self.timestamps = array("d")
+        self.offsets = array("d")
+        self._build_index()
+
+    def _build_index(self):
+        position = len(FILE_MAGIC)
+        end = len(self._map)
+        while position + RECORD_HEADER.size <= end:
+            timestamp, length = RECORD_HEADER.unpack_from(self._map, position)
+            if position + RECORD_HEADER.size + length > end:
+                break  # Truncated final record from an interrupted session
+            self.timestamps.append(timestamp)
+            self.offsets.append(position)
+            position += RECORD_HEADER.size + length
+
+    def __len__(self):
+        return len(self.offsets)
+
+    @property
+    def duration(self):
+        """Length of the recording in seconds."""
+        if not self.timestamps:
+            return 0.0
+        return (self.timestamps[-1] - self.timestamps[0]) / 1e6
+
+    def seek(self, timestamp):
+        """Return the index of the first frame at or after the given timestamp (microseconds)."""
+        return bisect.bisect_left(self.timestamps, timestamp)
+
+    def record(self, index):
+        """Return (timestamp, offset, length) of a record's payload inside the mapping."""
+        offset = int(self.offsets[index])
+        timestamp, length = RECORD_HEADER.unpack_from(self._map, offset)
+        return timestamp, offset + RECORD_HEADER.size, length
+
+    def frames(self, start=0, speed=1.0):
+        """Yield (timestamp, frame) pairs, paced like the original session.
+
+        Args:
+        - start (int, optional): Index of the first frame to emit. Default is 0.
+        - speed (float, optional): Playback rate. 1.0 keeps the original timing, 2.0 plays twice as
+          fast and 0 or None emits frames as fast as possible. Default is 1.0.
+        """
+        if start >= len(self):
+            return
+        first = self.timestamps[start]
+        started = _clock()
+        for index in range(start, len(self)):
+            timestamp, offset, length = self.record(index)
+            if speed:
+                delay = started + (timestamp - first) / 1e6 / speed - _clock()
+                if delay > 0:
+                    time.sleep(delay)
+            yield timestamp, self.decode(self._map, offset, length)
+
+    def play(self, listener, controller=None, start=0, speed=1.0):
+        """Drive a Leap.Listener with the recording as if the frames came from the sensor.
+
+        Args:
+        - listener: Listener whose on_init, on_connect, on_frame and on_exit callbacks are called.
+        - controller (ReplayController, optional): Controller handed to the callbacks.
+        - start (int, optional): Index of the first frame to emit. Default is 0.
+        - speed (float, optional): Playback rate, see frames(). Default is 1.0.
+
+        Returns:
+        - int: Number of frames delivered to on_frame.
+        """
+        controller = controller or ReplayController()
+        if start < len(self):
+            controller.timestamp = int(self.timestamps[start])  # The frame clock starts at the first frame, already in on_init
+        listener.on_init(controller)
+        listener.on_connect(controller)
+        delivered = 0
+        try:
+            for timestamp, frame in self.frames(start, speed):
+                controller.push(frame, timestamp)
+                if not controller.is_paused():
+                    listener.on_frame(controller)
+                    delivered += 1
+        finally:
+            listener.on_exit(controller)
+        return delivered
+
+    def close(self):
+        self._map.close()
+        self._file.close()
@@ -0,0 +1,289 @@
+'''
+Custom shape gestures drawn with the palm.
+ShapeRecognizer looks at the palm path of the controlling hand in HandHistory, in the plane facing
+the screen (x and y), and matches it against a template index in the style of the $1 recognizer:
+the path is resampled to a fixed number of points evenly spaced along its length, centered and
+scaled to a unit square, and scored by the mean distance to each template's points. Scaling to a
+square would blow a nearly straight stroke up into noise, so paths much longer than they are wide
+are not matched at all. Shapes are drawn facing the screen, while the hand slide behavior pans by
+moving the palm forward and back, so paths that move much in depth (z) are not matched either.
+Matching only runs once the palm slows down at the end of a stroke, which keeps continuous steering
+motion from being read as a shape and skips the work on most frames.
+
+Several path lengths are tried at once, since a shape may be drawn quickly or slowly. They are
+resampled together from one arc length table and scored against all templates in a single NumPy
+pass. With a few dozen templates one full pass is about twice as fast as comparing points in
+blocks with early abandon, because the block bookkeeping costs more NumPy calls than it saves.
+
+Built-in templates cover a circle (any start point, either direction) and a horizontal zigzag.
+More can be learned from recorded sessions and are stored in shape_templates.json:
+
+    python shapes.py learn circle session.leaprec 12.5 14.0
+    python shapes.py test session.leaprec
+'''
+
+import json
+import os
+import sys
+
+import numpy as np
+
+from handhistory import HandHistory
+from handsnapshot import HandExtractor
+
+TEMPLATE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "shape_templates.json")
+POINTS = 32
+
+# Shape name -> command, see hotkeys.py for the command tuples
+DEFAULT_ROUTES = {
+    "circle": ("home",),
+    "zigzag": ("rotate",),
+}
+
+
+def resample(points, count=POINTS):
+    """Resample a path to `count` points evenly spaced along its length, or None for a path without length."""
+    steps = np.sqrt((np.diff(points, axis=0) ** 2).sum(axis=1))
+    along = np.concatenate(([0.0], np.cumsum(steps)))
+    if along[-1] <= 0.0:
+        return None
+    targets = np.linspace(0.0, along[-1], count)
+    return np.column_stack([np.interp(targets, along, points[:, axis]) for axis in range(points.shape[1])])
+
+
+def normalize(points):
+    """Center a path, or each path of a (paths, points, 2) array, and scale it to a unit square as $1 does."""
+    extent = np.ptp(points, axis=-2)[..., None, :]
+    return (points - points.mean(axis=-2)[..., None, :]) / np.where(extent > 0, extent, 1.0)
+
+
+def builtin_templates(count=POINTS):
+    """Circle and zigzag templates. The circle comes in 8 start points times 2 directions."""
+    templates = {"circle": [], "zigzag": []}
+    angles = np.linspace(0.0, 2.0 * np.pi, count)
+    for start in np.linspace(0.0, 2.0 * np.pi, 8, endpoint=False):
+        for direction in (1.0, -1.0):
+            circle = np.column_stack((np.cos(start + direction * angles), np.sin(start + direction * angles)))
+            templates["circle"].append(normalize(circle))
+    zigzag = np.array([(0.0, 0.0), (1.0, 1.0), (2.0, 0.0), (3.0, 1.0), (4.0, 0.0)])
+    for path in (zigzag, zigzag[::-1]):
+        templates["zigzag"].append(normalize(resample(path, count)))
+    return templates
+
+
+# ShapeRecognizer Class:
+# Matches recent palm paths against templates.
+class ShapeRecognizer(object):
+
+    def __init__(self, templates=None, commands=None, routes=None, durations=(0.6, 0.9, 1.2, 1.5),
+                 threshold=0.12, min_size=80.0, min_aspect=0.25, max_depth=0.5, rest_speed=100.0, cooldown=1.0):
+        """Constructor for the ShapeRecognizer class.
+
+        Args:
+        - templates (dict, optional): Shape name -> list of (POINTS, 2) arrays. Default is the built-in templates.
+        - commands (deque, optional): Queue the routed commands are appended to. Default is None, nothing is queued.
+        - routes (dict, optional): Shape name -> command tuple. Default is DEFAULT_ROUTES.
+        - durations (tuple, optional): Path lengths in seconds tried every frame. Default is 0.6 to 1.5 s.
+        - threshold (float, optional): Largest accepted mean point distance, in unit sizes. Default is 0.12.
+        - min_size (float, optional): Smallest path extent in millimeters, smaller motion is ignored. Default is 80.
+        - min_aspect (float, optional): Smallest ratio of the short to the long side of a path. Default is 0.25.
+        - max_depth (float, optional): Largest depth (z) extent of a path relative to its long side. Default is 0.5.
+        - rest_speed (float, optional): Palm speed in mm/s over the last 0.1 s below which a stroke counts as finished. Default is 100.
+        - cooldown (float, optional): Seconds after a match during which nothing else is matched. Default is 1.
+        """
+        self.commands = commands
+        self.routes = dict(DEFAULT_ROUTES if routes is None else routes)
+        self.durations = durations
+        self._durations = (np.asarray(durations) * 1e6).astype(np.int64)
+        self.threshold = threshold
+        self.min_size = min_size
+        self.min_aspect = min_aspect
+        self.max_depth = max_depth
+        self.rest_speed = rest_speed
+        self.rest_radius = 10.0  # Millimeters around the resting palm treated as jitter
+        self.cooldown = int(cooldown * 1e6)
+        self.names = []
+        self._index = np.empty((0, POINTS, 2))
+        self.set_templates(builtin_templates() if templates is None else templates)
+        self._since = None      # Paths up to this timestamp are not used, set after a match and by skip_until
+        self.frames = 0
+        self.matches = 0
+
+    def set_templates(self, templates):
+        """Build the template index from a name -> list of paths mapping."""
+        names, rows = [], []
+        for name, paths in sorted(templates.items()):
+            for path in paths:
+                names.append(name)
+                rows.append(normalize(resample(np.asarray(path, dtype=float))))
+        self.names = names
+        self._index = np.array(rows) if rows else np.empty((0, POINTS, 2))
+
+    def candidates(self, timestamps, palm):
+        """Resampled, normalized (x, y) paths for each duration that ends at the newest sample.
+
+        Returns:
+        - ndarray: Shape (paths, POINTS, 2). Paths that are too short, too small, too thin or not
+          drawn facing the screen are left out.
+        """
+        starts = np.searchsorted(timestamps, timestamps[-1] - self._durations)
+        starts = starts[len(palm) - starts >= 8]
+        if not len(starts):
+            return np.empty((0, POINTS, 2))
+        # Extent of every path from its start to the newest sample, from running minima and maxima
+        extent = (np.maximum.accumulate(palm[::-1])[::-1] - np.minimum.accumulate(palm[::-1])[::-1])[starts]
+        longest, shortest = extent[:, :2].max(axis=1), extent[:, :2].min(axis=1)
+        starts = starts[(longest >= self.min_size) & (shortest >= self.min_aspect * longest) &
+                        (extent[:, 2] <= self.max_depth * longest)]
+        if not len(starts):
+            return np.empty((0, POINTS, 2))
+        points = palm[:, :2]
+        steps = np.sqrt((np.diff(points, axis=0) ** 2).sum(axis=1))
+        along = np.concatenate(([0.0], np.cumsum(steps)))
+        begin = along[starts][:, None]
+        targets = begin + (along[-1] - begin) * np.linspace(0.0, 1.0, POINTS)
+        paths = np.stack((np.interp(targets, along, points[:, 0]), np.interp(targets, along, points[:, 1])), axis=2)
+        return normalize(paths)
+
+    def match(self, candidates):
+        """Score every candidate against every template in one pass.
+
+        Returns:
+        - (str, float): Best template name and its mean point distance, or (None, None) if none is under the threshold.
+        """
+        if not len(candidates) or not len(self._index):
+            return None, None
+        distances = np.sqrt(((candidates[:, None] - self._index[None]) ** 2).sum(axis=3)).mean(axis=2)
+        candidate, template = np.unravel_index(np.argmin(distances), distances.shape)
+        score = float(distances[candidate, template])
+        if score > self.threshold:
+            return None, None
+        return self.names[template], score
+
+    def update(self, history, hand_id):
+        """Look for a shape in the recent path of one hand and queue its command. Call once per frame.
+
+        Args:
+        - history (HandHistory): Recent frames.
+        - hand_id (int): Id of the hand drawing, usually the controlling hand.
+
+        Returns:
+        - str: Name of the recognized shape, or None.
+        """
+        self.frames += 1
+        if hand_id is None or not len(history):
+            return None
+        window = history.window(max(self.durations))
+        timestamps, palm = window.track(hand_id)
+        if self._since is not None:
+            keep = timestamps > self._since
+            timestamps, palm = timestamps[keep], palm[keep]
+        if len(timestamps) < 8 or not self._resting(timestamps, palm):
+            return None
+        # Drop the resting tail, its jitter would add path length after the end of the stroke
+        moving = np.nonzero(((palm - palm[-1]) ** 2).sum(axis=1) > self.rest_radius ** 2)[0]
+        if len(moving):
+            timestamps, palm = timestamps[:moving[-1] + 2], palm[:moving[-1] + 2]
+        name, score = self.match(self.candidates(timestamps, palm))
+        if name is not None:
+            self.matches += 1
+            self._since = int(timestamps[-1]) + self.cooldown
+            command = self.routes.get(name)
+            if command and self.commands is not None:
+                self.commands.append(command)
+        return name
+
+    def skip_until(self, timestamp):
+        """Do not match paths before a timestamp, e.g. motion the sensor already reported as a gesture."""
+        if self._since is None or timestamp > self._since:
+            self._since = int(timestamp)
+
+    def _resting(self, timestamps, palm, span=100000):
+        """True if the palm moved slower than rest_speed over the last `span` microseconds."""
+        first = int(np.searchsorted(timestamps, timestamps[-1] - span))
+        if first >= len(timestamps) - 1:
+            return False
+        # Net displacement rather than path length, so sensor jitter does not count as motion
+        moved = np.sqrt(((palm[-1] - palm[first]) ** 2).sum())
+        return moved * 1e6 / max(timestamps[-1] - timestamps[first], 1) < self.rest_speed
+
+    @classmethod
+    def load(cls, path=TEMPLATE_FILE, **kwargs):
+        """Built-in templates plus the learned ones stored in a file."""
+        templates = builtin_templates()
+        if os.path.exists(path):
+            with open(path) as handle:
+                for name, paths in json.load(handle).items():
+                    templates.setdefault(name, []).extend(np.array(p) for p in paths)
+        return cls(templates, **kwargs)
+
+
+def recorded_path(recording, start=None, end=None):
+    """Palm path (x, y) of the first hand in a recording, optionally between two times in seconds."""
+    from recording import FramePlayer
+
+    player = FramePlayer(recording)
+    extractor = HandExtractor()
+    points = []
+    try:
+        first = player.timestamps[0] if len(player) else 0
+        for timestamp, frame in player.frames(speed=0):
+            seconds = (timestamp - first) / 1e6
+            if (start is not None and seconds < start) or (end is not None and seconds > end):
+                continue
+            hands = extractor.extract(frame).hands
+            if hands:
+                points.append((hands[0].palm_x, hands[0].palm_y))
+    finally:
+        player.close()
+    return np.array(points)
+
+
+def learn(name, recording, start=None, end=None, path=TEMPLATE_FILE):
+    """Add the palm path of a recording as a template for a shape and save it."""
+    points = recorded_path(recording, start, end)
+    if len(points) < 8:
+        raise ValueError("Not enough hand samples in '{}'.".format(recording))
+    learned = {}
+    if os.path.exists(path):
+        with open(path) as handle:
+            learned = json.load(handle)
+    learned.setdefault(name, []).append(normalize(resample(points)).round(4).tolist())
+    with open(path, "w") as handle:
+        json.dump(learned, handle)
+
+
+def test(recording):
+    """Run the recognizer over a recording and print what it matches."""
+    from recording import FramePlayer
+
+    recognizer = ShapeRecognizer.load()
+    history = HandHistory()
+    extractor = HandExtractor()
+    player = FramePlayer(recording)
+    try:
+        first = player.timestamps[0] if len(player) else 0
+        for timestamp, frame in player.frames(speed=0):
+            hands = extractor.extract(frame)
+            history.append(hands)
+            name = recognizer.update(history, hands.hands[0].id if hands.hands else None)
+            if name:
+                print("{:8.2f} s  {}".format((timestamp - first) / 1e6, name))
+    finally:
+        player.close()
+    print("{} matches in {} frames".format(recognizer.matches, recognizer.frames))
+
+
+def main(argv):
+    if len(argv) >= 4 and argv[1] == "learn":
+        bounds = [float(value) for value in argv[4:6]]
+        learn(argv[2], argv[3], *bounds)
+        print("Learned {} from {}".format(argv[2], argv[3]))
+    elif len(argv) == 3 and argv[1] == "test":
+        test(argv[2])
+    else:
+        print("Usage: python shapes.py learn NAME RECORDING [START END] | test RECORDING")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,116 @@
+'''
+Street View detection.
+Google Earth shows a white "Exit Street View" button in the top-right corner while in Street View.
+StreetViewDetector reads only that pixel, on a background thread at a low rate, and publishes the
+last result with the time it was taken. Behaviors read the cached value instead of taking a
+full-screen screenshot inside the frame loop.
+
+On Windows the pixel is read with GetPixel on the screen DC. pyautogui.screenshot(region=...) is
+not used there: the pinned pyscreeze and Pillow grab the whole screen and crop it afterwards.
+'''
+
+import threading
+import time
+
+import pyautogui
+
+try:
+    import win32gui
+except ImportError:
+    win32gui = None  # Not on Windows
+
+_clock = getattr(time, "monotonic", time.time)
+
+
+def grab_pixel(x, y):
+    """Read a single screen pixel as an (r, g, b) tuple."""
+    if win32gui is None:
+        # Elsewhere only a screenshot is available, this captures more than the one pixel
+        return pyautogui.screenshot(region=(x, y, 1, 1)).getpixel((0, 0))[:3]
+    screen = win32gui.GetDC(0)
+    try:
+        color = win32gui.GetPixel(screen, x, y)  # COLORREF, 0x00bbggrr
+    finally:
+        win32gui.ReleaseDC(0, screen)
+    return (color & 0xff, (color >> 8) & 0xff, (color >> 16) & 0xff)
+
+
+# StreetViewDetector Class:
+# Samples the "Exit Street View" button pixel in the background.
+class StreetViewDetector(object):
+
+    def __init__(self, pixel=(1893, 38), expected_color=(252, 252, 252), interval=0.5, grab=grab_pixel):
+        """Constructor for the StreetViewDetector class.
+
+        Args:
+        - pixel (tuple, optional): Screen coordinates of the "Exit Street View" button, may need fine-tuning for your screen. Default is (1893, 38).
+        - expected_color (tuple, optional): Button color while in Street View. Default is (252, 252, 252).
+        - interval (float, optional): Seconds between samples. Default is 0.5.
+        - grab (callable, optional): Called with (x, y) to read a pixel. Default is grab_pixel.
+        """
+        self.pixel = pixel
+        self.expected_color = tuple(expected_color)
+        self.interval = interval
+        self.grab = grab
+        self.value = False       # Last published result
+        self.timestamp = None    # Monotonic time of the last sample, None before the first one
+        self.samples = 0
+        self._wake = threading.Event()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        """Start the sampler thread if it is not already running."""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="StreetViewDetector")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        if not self._running:
+            return
+        self._running = False
+        self._wake.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def sample(self):
+        """Take one sample now and publish it.
+
+        Returns:
+        - bool: True if in Street View.
+        """
+        in_street_view = tuple(self.grab(*self.pixel))[:3] == self.expected_color
+        self.value = in_street_view
+        self.timestamp = _clock()
+        self.samples += 1
+        return in_street_view
+
+    def refresh(self):
+        """Ask the sampler for a new sample without waiting for the interval."""
+        self._wake.set()
+
+    @property
+    def in_street_view(self):
+        """Last published result. Starts the sampler on first use."""
+        if not self._running:
+            self.start()
+        return self.value
+
+    @property
+    def age(self):
+        """Seconds since the last sample, or None before the first one."""
+        if self.timestamp is None:
+            return None
+        return _clock() - self.timestamp
+
+    def _run(self):
+        while self._running:
+            try:
+                self.sample()
+            except Exception:
+                pass  # Screen capture can fail briefly, e.g. on a locked screen; keep the last value
+            self._wake.wait(self.interval)
+            self._wake.clear()
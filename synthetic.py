@@ -0,0 +1,183 @@
+'''
+Synthetic hand trajectories for load testing.
+TrajectoryGenerator builds deterministic hand data from a script of simple paths (holds, circles,
+sweeps, zoom ramps, tilts and dropouts) at any frame rate. Frames are computed in NumPy batches laid
+out like LeapEmulation.HAND_FIELDS, so the generator keeps up with rates well above 1 kHz.
+
+Example:
+
+    generator = TrajectoryGenerator(rate=1000, hands=2)
+    generator.sweep(2.0).zoom_ramp(2.0).dropout(0.5).circle(3.0)
+    for frame in generator.frames():
+        controller.push(frame)
+'''
+
+import numpy as np
+
+import LeapEmulation
+
+# Column indices inside one hand row, see LeapEmulation.HAND_FIELDS
+_ID, _IS_LEFT, _CONFIDENCE = 0, 1, 2
+_PALM = slice(3, 6)
+_VELOCITY = slice(6, 9)
+_NORMAL = slice(9, 12)
+_DIRECTION = slice(12, 15)
+
+# Thresholds used by the behaviors, so the default paths cross them
+SLIDE_OUTER_LIMITS = 200
+ZOOM_IN_THRESHOLD = 120
+ZOOM_OUT_THRESHOLD = 140
+
+
+# FrameBatch Class:
+# A block of consecutive frames. hands has shape (frames, hand count, HAND_WIDTH).
+class FrameBatch(object):
+    __slots__ = ("frame_ids", "timestamps", "hands", "present")
+
+    def __init__(self, frame_ids, timestamps, hands, present):
+        self.frame_ids = frame_ids
+        self.timestamps = timestamps
+        self.hands = hands
+        self.present = present
+
+    def __len__(self):
+        return len(self.timestamps)
+
+
+# TrajectoryGenerator Class:
+# Collects path segments and renders them into frames.
+class TrajectoryGenerator(object):
+
+    def __init__(self, rate=1000.0, hands=1, seed=0, jitter=0.0, hand_spacing=120.0, start_timestamp=0):
+        """Constructor for the TrajectoryGenerator class.
+
+        Args:
+        - rate (float, optional): Frames per second. Default is 1000.
+        - hands (int, optional): Number of hands in every frame that is not a dropout. Default is 1.
+        - seed (int, optional): Seed for the position jitter. Default is 0.
+        - jitter (float, optional): Standard deviation of the position noise in millimeters. Default is 0.
+        - hand_spacing (float, optional): Distance along x between neighbouring hands in millimeters. Default is 120.
+        - start_timestamp (int, optional): Timestamp of the first frame in microseconds. Default is 0.
+        """
+        self.rate = float(rate)
+        self.hand_count = hands
+        self.jitter = jitter
+        self.hand_spacing = hand_spacing
+        self.start_timestamp = start_timestamp
+        self.seed = seed
+        self._segments = []  # (frame count, path function or None for a dropout)
+
+    # Path segments. Each returns self so scripts can be chained.
+
+    def hold(self, duration, position=(0.0, 200.0, 0.0), pitch=0.0, roll=0.0, yaw=0.0):
+        """Keep the hand still. Angles are in degrees."""
+        position = np.asarray(position, dtype=np.float64)
+        angles = np.radians([pitch, roll, yaw])
+
+        def path(t):
+            return np.tile(position, (len(t), 1)), np.tile(angles, (len(t), 1))
+        return self._add(duration, path)
+
+    def circle(self, duration, radius=100.0, height=200.0, period=2.0):
+        """Move the palm in a horizontal circle around the sensor."""
+        def path(t):
+            phase = 2.0 * np.pi * t / period
+            positions = np.column_stack((radius * np.cos(phase), np.full(len(t), height), radius * np.sin(phase)))
+            return positions, np.zeros((len(t), 3))
+        return self._add(duration, path)
+
+    def sweep(self, duration, axis="x", start=-SLIDE_OUTER_LIMITS - 50.0, stop=SLIDE_OUTER_LIMITS + 50.0, height=200.0):
+        """Slide the palm linearly along the x or z axis, across dead_zone and outer_limits by default."""
+        column = {"x": 0, "z": 2}[axis]
+
+        def path(t):
+            positions = np.zeros((len(t), 3))
+            positions[:, 1] = height
+            positions[:, column] = start + (stop - start) * (t / duration)
+            return positions, np.zeros((len(t), 3))
+        return self._add(duration, path)
+
+    def zoom_ramp(self, duration, start=ZOOM_IN_THRESHOLD / 2.0, stop=ZOOM_OUT_THRESHOLD + 180.0):
+        """Raise the palm linearly, passing through both exponential_zoom thresholds by default."""
+        def path(t):
+            positions = np.zeros((len(t), 3))
+            positions[:, 1] = start + (stop - start) * (t / duration)
+            return positions, np.zeros((len(t), 3))
+        return self._add(duration, path)
+
+    def tilt(self, duration, pitch=(-45.0, 45.0), roll=(0.0, 0.0), yaw=(0.0, 0.0), height=200.0):
+        """Rotate the palm linearly between (start, stop) angles in degrees, for HandTiltBehavior."""
+        ranges = np.radians([pitch, roll, yaw])
+
+        def path(t):
+            fraction = (t / duration)[:, None]
+            angles = ranges[:, 0] + (ranges[:, 1] - ranges[:, 0]) * fraction
+            positions = np.zeros((len(t), 3))
+            positions[:, 1] = height
+            return positions, angles
+        return self._add(duration, path)
+
+    def dropout(self, duration):
+        """No hands at all for the given time."""
+        return self._add(duration, None)
+
+    def _add(self, duration, path):
+        self._segments.append((int(round(duration * self.rate)), path))
+        return self
+
+    def __len__(self):
+        return sum(count for count, _ in self._segments)
+
+    @property
+    def duration(self):
+        return len(self) / self.rate
+
+    # Rendering
+
+    def batches(self, batch_size=4096):
+        """Yield the script as FrameBatch blocks of at most batch_size frames."""
+        random = np.random.RandomState(self.seed)
+        offsets = (np.arange(self.hand_count) - (self.hand_count - 1) / 2.0) * self.hand_spacing
+        step = 1.0 / self.rate
+        index = 0
+
+        for count, path in self._segments:
+            for first in range(0, count, batch_size):
+                size = min(batch_size, count - first)
+                frames = np.arange(index, index + size)
+                timestamps = self.start_timestamp + np.round(frames * (1e6 / self.rate)).astype(np.int64)
+                hands = np.zeros((size, self.hand_count, LeapEmulation.HAND_WIDTH))
+
+                if path is None:
+                    present = np.zeros(size, dtype=bool)
+                else:
+                    present = np.ones(size, dtype=bool)
+                    t = (first + np.arange(size)) * step
+                    positions, angles = path(t)
+                    previous, _ = path(t - step)
+                    velocity = (positions - previous) * self.rate
+
+                    pitch, roll, yaw = angles[:, 0], angles[:, 1], angles[:, 2]
+                    direction = np.column_stack((np.sin(yaw) * np.cos(pitch), np.sin(pitch), -np.cos(yaw) * np.cos(pitch)))
+                    normal = np.column_stack((np.sin(roll), -np.cos(roll), np.zeros(size)))
+
+                    hands[:, :, _ID] = np.arange(1, self.hand_count + 1)
+                    hands[:, :, _IS_LEFT] = np.arange(self.hand_count) % 2
+                    hands[:, :, _CONFIDENCE] = 1.0
+                    hands[:, :, _PALM] = positions[:, None, :]
+                    hands[:, :, 3] += offsets
+                    if self.jitter:
+                        hands[:, :, _PALM] += random.normal(0.0, self.jitter, (size, self.hand_count, 3))
+                    hands[:, :, _VELOCITY] = velocity[:, None, :]
+                    hands[:, :, _NORMAL] = normal[:, None, :]
+                    hands[:, :, _DIRECTION] = direction[:, None, :]
+
+                yield FrameBatch(frames, timestamps, hands, present)
+                index += size
+
+    def frames(self, batch_size=4096):
+        """Yield the script as LeapEmulation.Frame objects."""
+        for batch in self.batches(batch_size):
+            for i in range(len(batch)):
+                values = batch.hands[i].ravel() if batch.present[i] else ()
+                yield LeapEmulation.Frame.from_array(int(batch.frame_ids[i]), int(batch.timestamps[i]), values)
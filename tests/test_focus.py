@@ -0,0 +1,69 @@
+'''
+Focus caching over a run of frames at 120 fps. The cache clock is set to each frame's time, so the
+results do not depend on how fast the test machine runs.
+'''
+
+import pytest
+
+import focus
+from focus import CachedFocusProvider, FakeFocusProvider, GOOGLE_EARTH_TITLE
+
+
+@pytest.fixture
+def frame_clock(monkeypatch):
+    """Replace the cache clock with one the test sets to each frame's time."""
+    now = [0.0]
+    monkeypatch.setattr(focus, "_clock", lambda: now[0])
+    return now
+
+
+def test_cache_asks_once_per_ttl(frame_clock):
+    fake = FakeFocusProvider()
+    provider = CachedFocusProvider(fake, ttl=0.5)
+    for i in range(240):
+        frame_clock[0] = i / 120.0
+        assert provider.is_active(GOOGLE_EARTH_TITLE)
+
+    # One system call at 0, 0.5, 1.0 and 1.5 s, every other frame is served from the cache
+    assert fake.calls == provider.misses == 4
+    assert provider.hits == 236
+    assert provider.hit_rate == pytest.approx(236.0 / 240.0)
+
+
+def test_focus_change_is_seen_within_ttl(frame_clock):
+    fake = FakeFocusProvider()
+    provider = CachedFocusProvider(fake, ttl=0.5)
+    seen = None
+    for i in range(240):
+        frame_clock[0] = i / 120.0
+        if frame_clock[0] >= 0.7:
+            fake.title = "Notepad"
+        if not provider.is_active() and seen is None:
+            seen = frame_clock[0]
+
+    # The stale title is served until the entry cached at 0.5 s expires
+    assert seen == pytest.approx(1.0)
+
+
+def test_invalidate_refreshes_on_the_next_frame(frame_clock):
+    fake = FakeFocusProvider()
+    provider = CachedFocusProvider(fake, ttl=0.5)
+    active = []
+    for i in range(120):
+        frame_clock[0] = i / 120.0
+        if i == 30:
+            # A focus change notification arrives between two frames
+            fake.title = "Notepad"
+            provider.invalidate()
+        active.append(provider.is_active())
+
+    assert active[:30] == [True] * 30
+    assert not any(active[30:])
+    # The first frame, the invalidated one at 0.25 s and its expiry at 0.75 s
+    assert fake.calls == provider.misses == 3
+
+
+def test_default_provider_is_cached():
+    provider = focus.default_provider(ttl=0.25)
+    assert isinstance(provider, CachedFocusProvider)
+    assert provider.ttl == 0.25
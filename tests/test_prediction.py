@@ -0,0 +1,70 @@
+'''
+Prediction error with and without PosePredictor, on synthetic sessions and on the same session
+played back from a recording. evaluate() compares the predicted palm, and the palm left unchanged,
+with where the palm actually was one horizon later.
+'''
+
+import pytest
+
+from handsnapshot import HandExtractor
+from prediction import PosePredictor, evaluate
+from recording import FramePlayer, FrameRecorder
+from synthetic import TrajectoryGenerator
+
+
+def extracted(frames):
+    extractor = HandExtractor()
+    return (extractor.extract(frame) for frame in frames)
+
+
+def mixed_session(jitter=0.0):
+    generator = TrajectoryGenerator(rate=120, jitter=jitter, start_timestamp=10 ** 9)
+    return generator.sweep(2.0).zoom_ramp(2.0).dropout(0.5).circle(3.0)
+
+
+@pytest.mark.parametrize("jitter", [0.0, 1.0])
+def test_prediction_reduces_error_on_moving_hands(jitter):
+    result = evaluate(extracted(mixed_session(jitter).frames()), PosePredictor(latency=0.05))
+
+    assert result["samples"] > 800
+    # Without prediction the palm trails by about 14 mm, the predictor gets within about 5 mm
+    assert result["predicted"] < 0.5 * result["baseline"]
+
+
+def test_steady_sweep_is_predicted_exactly():
+    generator = TrajectoryGenerator(rate=120).sweep(3.0)
+    result = evaluate(extracted(generator.frames()), PosePredictor(latency=0.05))
+
+    assert result["baseline"] > 5.0
+    assert result["predicted"] == pytest.approx(0.0, abs=1e-3)
+
+
+@pytest.mark.parametrize("jitter", [0.0, 1.0])
+def test_resting_hand_does_not_overshoot(jitter):
+    generator = TrajectoryGenerator(rate=120, jitter=jitter).hold(2.0)
+    result = evaluate(extracted(generator.frames()), PosePredictor(latency=0.05))
+
+    # Jitter alone must not be extrapolated into noticeable motion
+    assert result["predicted"] <= result["baseline"] + 0.5
+
+
+def test_recorded_session_matches_synthetic(tmp_path):
+    path = str(tmp_path / "session.leaprec")
+    recorder = FrameRecorder(path)
+    recorder.start()
+    for frame in mixed_session(jitter=1.0).frames():
+        recorder.record(frame)
+    recorder.stop()
+
+    player = FramePlayer(path)
+    try:
+        frames = [frame for _, frame in player.frames(speed=0)]
+    finally:
+        player.close()
+    recorded = evaluate(extracted(frames), PosePredictor(latency=0.05))
+    synthetic = evaluate(extracted(mixed_session(jitter=1.0).frames()), PosePredictor(latency=0.05))
+
+    assert recorded["samples"] == synthetic["samples"]
+    assert recorded["predicted"] == pytest.approx(synthetic["predicted"], rel=1e-3)
+    assert recorded["baseline"] == pytest.approx(synthetic["baseline"], rel=1e-3)
+    assert recorded["predicted"] < recorded["baseline"]
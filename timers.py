@@ -0,0 +1,242 @@
+'''
+Timer wheel for idle and cooldown events.
+Behaviors register one-shot or periodic deadlines (auto-navigate after 30 s without hands, rotate
+planets every 120 s, the 7 s planet switch cooldown) instead of comparing rounded clock values on
+every frame. Timers live in a hashed wheel of slots, one slot per tick, so arming, re-arming and
+cancelling are O(1) and advancing the wheel only looks at the timers in the slots it passes.
+
+Deadlines use the monotonic clock and fire exactly once per arming, at most one tick late. If the
+wheel thread stalls, missed deadlines fire as soon as it catches up. The wheel thread starts with
+the first armed timer; advance() can also be called directly, e.g. with a fake clock in tests.
+Replay switches the wheel to the frame clock with set_clock() and advances it once per frame, so
+idle and cooldown timers fire at the same frame on every run.
+
+Callbacks run on the thread that advances the wheel unless `post` is set. The listener sets it to
+queue each due callback as a command, so callbacks run on the behavior worker together with
+everything else that touches behavior state. A queued callback that was cancelled or re-armed
+before the worker got to it is skipped.
+'''
+
+import math
+import threading
+import time
+import traceback
+
+_clock = getattr(time, "monotonic", time.time)
+
+
+# Timer Class:
+# Handle for one deadline in a TimerWheel. Created unarmed by TimerWheel.timer.
+class Timer(object):
+    __slots__ = ("wheel", "callback", "delay", "period", "deadline", "rounds", "slot", "epoch")
+
+    def __init__(self, wheel, callback, delay, period=None):
+        self.wheel = wheel
+        self.callback = callback
+        self.delay = delay
+        self.period = period
+        self.deadline = None
+        self.rounds = 0
+        self.slot = None    # Index of the wheel slot holding the timer, None while not armed
+        self.epoch = 0      # Bumped on every arm and cancel so a stale firing is skipped
+
+    def arm(self, delay=None):
+        """Schedule the timer, replacing a pending deadline.
+
+        Args:
+        - delay (float, optional): Seconds from now. Default is the delay the timer was created with.
+        """
+        self.wheel._arm(self, self.delay if delay is None else delay)
+
+    def cancel(self):
+        self.wheel._cancel(self)
+
+    @property
+    def armed(self):
+        return self.slot is not None
+
+    @property
+    def remaining(self):
+        """Seconds until the deadline, or None while not armed."""
+        if self.slot is None:
+            return None
+        return max(0.0, self.deadline - self.wheel.clock())
+
+
+# TimerWheel Class:
+# Hashed timing wheel, driven by its own thread or by calls to advance().
+class TimerWheel(object):
+
+    def __init__(self, tick=0.1, slots=256, clock=_clock):
+        """Constructor for the TimerWheel class.
+
+        Args:
+        - tick (float, optional): Seconds per slot, the timer resolution. Default is 0.1.
+        - slots (int, optional): Slots per revolution. Longer deadlines wait extra rounds. Default is 256.
+        - clock (callable, optional): Monotonic time source. Default is time.monotonic where available.
+        """
+        self.tick = tick
+        self.clock = clock
+        self._slots = [set() for _ in range(slots)]
+        self._cursor = 0
+        self._time = clock()   # Time of the slot under the cursor
+        self._count = 0
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+        self.threaded = True   # Start the wheel thread on the first arm(), see set_clock()
+        self.post = None       # Called with a no-argument function per due timer instead of running it here
+        self.fired = 0
+
+    def timer(self, callback, delay, period=None):
+        """Create an unarmed timer.
+
+        Args:
+        - callback (callable): Called without arguments when the deadline passes.
+        - delay (float): Default delay in seconds used by Timer.arm().
+        - period (float, optional): Re-arm the timer with this interval after it fires.
+        """
+        return Timer(self, callback, delay, period)
+
+    def schedule(self, delay, callback, period=None):
+        """Create and arm a timer.
+
+        Returns:
+        - Timer: Handle to cancel or re-arm the timer.
+        """
+        timer = Timer(self, callback, delay, period)
+        timer.arm()
+        return timer
+
+    def set_clock(self, clock, threaded=True):
+        """Switch to another time source, e.g. the frame clock during replay. Pending timers keep
+        the time they had left.
+
+        Args:
+        - clock (callable): Time source in seconds.
+        - threaded (bool, optional): False stops the wheel thread; the caller then runs advance() itself. Default is True.
+        """
+        if not threaded:
+            self.stop()
+        with self._cond:
+            now = self.clock()
+            pending = [(timer, timer.deadline - now) for slot in self._slots for timer in slot]
+            for timer, _ in pending:
+                self._unlink(timer)
+            self.clock = clock
+            self.threaded = threaded
+            self._time = clock()
+            for timer, remaining in pending:
+                self._link(timer, self._time + max(0.0, remaining))
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="TimerWheel")
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self, timeout=1.0):
+        with self._cond:
+            if not self._running:
+                return
+            self._running = False
+            self._cond.notify()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def __len__(self):
+        return self._count
+
+    def _arm(self, timer, delay):
+        if self.threaded and not self._running:
+            self.start()
+        with self._cond:
+            now = self.clock()
+            if self._count == 0:
+                self._time = now  # Nothing pending, skip the idle ticks instead of walking them
+            self._unlink(timer)
+            timer.epoch += 1
+            self._link(timer, now + delay)
+            self._cond.notify()
+
+    def _cancel(self, timer):
+        with self._cond:
+            self._unlink(timer)
+            timer.epoch += 1
+
+    def _link(self, timer, deadline):
+        ticks = max(1, int(math.ceil((deadline - self._time) / self.tick)))
+        timer.deadline = deadline
+        timer.rounds = (ticks - 1) // len(self._slots)
+        timer.slot = (self._cursor + ticks) % len(self._slots)
+        self._slots[timer.slot].add(timer)
+        self._count += 1
+
+    def _unlink(self, timer):
+        if timer.slot is not None:
+            self._slots[timer.slot].discard(timer)
+            timer.slot = None
+            self._count -= 1
+
+    def advance(self, now=None):
+        """Move the wheel up to now and run, or post, the callbacks of every deadline passed.
+
+        Returns:
+        - int: Number of callbacks run or posted.
+        """
+        due = []
+        with self._cond:
+            now = self.clock() if now is None else now
+            if self._count == 0:
+                self._time = max(self._time, now)
+                return 0
+            while self._time + self.tick <= now:
+                self._time += self.tick
+                self._cursor = (self._cursor + 1) % len(self._slots)
+                slot = self._slots[self._cursor]
+                for timer in list(slot):
+                    if timer.rounds > 0:
+                        timer.rounds -= 1
+                        continue
+                    self._unlink(timer)
+                    due.append((timer, timer.epoch))
+                    if timer.period:
+                        # Re-arm from the old deadline so periodic timers do not drift, but skip
+                        # periods that were missed entirely instead of firing them back to back
+                        deadline = timer.deadline + timer.period
+                        if deadline <= now:
+                            deadline = now + timer.period
+                        self._link(timer, deadline)
+        fired = 0
+        for timer, epoch in due:
+            if self.post is not None:
+                self.post(lambda timer=timer, epoch=epoch: self._fire(timer, epoch))
+                fired += 1
+            elif self._fire(timer, epoch):
+                fired += 1
+        return fired
+
+    def _fire(self, timer, epoch):
+        """Run a due callback unless the timer was cancelled or re-armed since it came due."""
+        if timer.epoch != epoch:
+            return False
+        try:
+            timer.callback()
+        except Exception:
+            traceback.print_exc()
+        self.fired += 1
+        return True
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._running:
+                    return
+                # Sleep until the next tick, or until something is armed when the wheel is empty
+                self._cond.wait(self.tick if self._count else None)
+                if not self._running:
+                    return
+            self.advance()
@@ -0,0 +1,117 @@
+'''
+Hand tracking across frames.
+Leap keeps a hand's id for as long as it stays in view. HandTracker keeps a TrackedHand per id,
+updated each frame through frame.hand(id) lookups, and picks one controlling hand with a
+configurable policy. The controlling hand only changes when the policy clearly prefers another hand
+or the current one leaves, so a second visitor reaching in does not make control jump between hands.
+Hands that have not been seen for a short time are evicted with their state.
+
+Policies:
+- "first_seen": the hand that has been in view the longest
+- "closest": the hand closest to the center above the sensor
+- "dominant": a right hand (or left, see HandTracker.dominant) before any other, then first seen
+'''
+
+FIRST_SEEN = "first_seen"
+CLOSEST = "closest"
+DOMINANT = "dominant"
+
+
+# TrackedHand Class:
+# State kept for one hand id while it is in view. Behaviors can keep their own values in `data`.
+class TrackedHand(object):
+    __slots__ = ("id", "first_seen", "last_seen", "frames", "hand", "data")
+
+    def __init__(self, hand, timestamp):
+        self.id = hand.id
+        self.first_seen = timestamp
+        self.last_seen = timestamp
+        self.frames = 0
+        self.hand = hand   # Latest HandSnapshot
+        self.data = {}
+
+
+# HandTracker Class:
+# Follows hands by id and chooses the one that controls the behavior.
+class HandTracker(object):
+
+    def __init__(self, policy=FIRST_SEEN, dominant="right", evict_after=0.25, switch_margin=30.0):
+        """Constructor for the HandTracker class.
+
+        Args:
+        - policy (str, optional): "first_seen", "closest" or "dominant". Default is "first_seen".
+        - dominant (str, optional): "right" or "left", used by the "dominant" policy. Default is "right".
+        - evict_after (float, optional): Seconds a hand may be missing before its state is dropped. Default is 0.25.
+        - switch_margin (float, optional): How much closer to the center, in millimeters, another hand
+          must be before the "closest" policy hands over control. Default is 30.
+        """
+        if policy not in (FIRST_SEEN, CLOSEST, DOMINANT):
+            raise ValueError("Unknown hand policy '{}'.".format(policy))
+        self.policy = policy
+        self.dominant_left = dominant == "left"
+        self.evict_after = int(evict_after * 1e6)
+        self.switch_margin = switch_margin
+        self.hands = {}          # Hand id -> TrackedHand
+        self.controller_id = None
+        self.switches = 0
+        self.evicted = 0
+
+    def update(self, frame):
+        """Update the tracked hands from a HandFrame and pick the controlling hand.
+
+        Returns:
+        - HandSnapshot: The controlling hand in this frame, or None if no hand is in view.
+        """
+        timestamp = frame.timestamp
+        for hand in frame.hands:
+            tracked = self.hands.get(hand.id)
+            if tracked is None:
+                tracked = self.hands[hand.id] = TrackedHand(hand, timestamp)
+            tracked.hand = hand
+            tracked.last_seen = timestamp
+            tracked.frames += 1
+
+        if len(self.hands) > len(frame.hands):
+            for hand_id, tracked in list(self.hands.items()):
+                if timestamp - tracked.last_seen > self.evict_after:
+                    del self.hands[hand_id]
+                    self.evicted += 1
+
+        if not frame.hands:
+            return None
+
+        current = frame.hand(self.controller_id) if self.controller_id is not None else None
+        chosen = self._choose(frame.hands, current)
+        if chosen.id != self.controller_id:
+            if self.controller_id is not None:
+                self.switches += 1
+            self.controller_id = chosen.id
+        return chosen
+
+    def _choose(self, hands, current):
+        if len(hands) == 1:
+            return hands[0]
+        if self.policy == CLOSEST:
+            closest = min(hands, key=_center_distance)
+            if current is None or _center_distance(current) - _center_distance(closest) > self.switch_margin:
+                return closest
+            return current
+        if self.policy == DOMINANT:
+            dominant = [hand for hand in hands if hand.is_left == self.dominant_left]
+            if dominant:
+                if current is not None and current.is_left == self.dominant_left:
+                    return current
+                hands = dominant
+        if current is not None and current in hands:
+            return current
+        return min(hands, key=lambda hand: self.hands[hand.id].first_seen)
+
+    @property
+    def controller(self):
+        """TrackedHand of the controlling hand, or None."""
+        return self.hands.get(self.controller_id)
+
+
+def _center_distance(hand):
+    """Horizontal distance of the palm from the point straight above the sensor, in millimeters."""
+    return (hand.palm_x ** 2 + hand.palm_z ** 2) ** 0.5
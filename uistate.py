@@ -0,0 +1,277 @@
+'''
+Google Earth UI state classification.
+UIStateService captures a few small probe regions of the screen, on a background thread, and
+classifies each one by looking up a hash of its pixels in a table of learned templates.
+It publishes the resulting UIState (Street View, current planet, search box open, menu open) and
+notifies subscribers whenever a field changes, so behaviors can react as soon as the UI confirms a
+change instead of waiting out fixed timeouts.
+
+Probe positions and templates depend on the screen and Google Earth version. Learn them once on the
+kiosk with Google Earth in each state, e.g.:
+
+    python uistate.py learn planet Mars
+    python uistate.py learn search_open True
+
+Templates are stored in ui_templates.json next to this file.
+
+On Windows every probe is copied on its own with a BitBlt of just that rectangle, a few hundred
+pixels per sample. pyautogui.screenshot(region=...) is not used there: the pinned pyscreeze and
+Pillow grab the whole screen and crop it afterwards.
+'''
+
+import json
+import os
+import sys
+import threading
+import time
+import zlib
+
+import pyautogui
+
+try:
+    import win32con
+    import win32gui
+    import win32ui
+except ImportError:
+    win32gui = None  # Not on Windows
+
+_clock = getattr(time, "monotonic", time.time)
+
+TEMPLATE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ui_templates.json")
+
+# Probe regions (x, y, width, height) for a 1920x1080 screen, one per UIState field. Each one is
+# captured on its own, so they can sit anywhere on the screen.
+DEFAULT_PROBES = {
+    "street_view": (1893, 38, 1, 1),   # "Exit Street View" button
+    "planet": (600, 36, 24, 16),       # Planet button in the toolbar
+    "search_open": (8, 72, 32, 8),     # Search panel header
+    "menu_open": (96, 24, 16, 8),      # First entry of an open View menu
+}
+
+# Template seeded for the Street View button so it works before anything is learned
+_STREET_VIEW_WHITE = bytearray((252, 252, 252))
+
+
+def region_hash(data, shift=3):
+    """Hash raw RGB bytes after dropping the low bits of every channel to ignore small noise."""
+    return "{:08x}".format(zlib.crc32(bytes(bytearray(value >> shift for value in bytearray(data)))) & 0xffffffff)
+
+
+# UIState Class:
+# Snapshot of what the classifier knows. None means the probe matched no template.
+class UIState(object):
+    __slots__ = ("street_view", "planet", "search_open", "menu_open", "timestamp")
+
+    def __init__(self, street_view=None, planet=None, search_open=None, menu_open=None, timestamp=None):
+        self.street_view = street_view
+        self.planet = planet
+        self.search_open = search_open
+        self.menu_open = menu_open
+        self.timestamp = timestamp
+
+    def fields(self):
+        return dict((name, getattr(self, name)) for name in DEFAULT_PROBES)
+
+    def __repr__(self):
+        return "UIState(street_view={}, planet={}, search_open={}, menu_open={})".format(
+            self.street_view, self.planet, self.search_open, self.menu_open)
+
+
+def grab_region(region):
+    """Capture a screen rectangle (x, y, width, height) as raw RGB bytes, row by row."""
+    if win32gui is None:
+        # Elsewhere only a screenshot is available, this captures more than the rectangle
+        return pyautogui.screenshot(region=region).convert("RGB").tobytes()
+    x, y, width, height = region
+    window = win32gui.GetDesktopWindow()
+    screen = win32gui.GetWindowDC(window)
+    source = win32ui.CreateDCFromHandle(screen)
+    memory = source.CreateCompatibleDC()
+    bitmap = win32ui.CreateBitmap()
+    try:
+        bitmap.CreateCompatibleBitmap(source, width, height)
+        memory.SelectObject(bitmap)
+        memory.BitBlt((0, 0), (width, height), source, (x, y), win32con.SRCCOPY)
+        bgra = bytearray(bitmap.GetBitmapBits(True))
+    finally:
+        memory.DeleteDC()
+        source.DeleteDC()
+        win32gui.ReleaseDC(window, screen)
+        win32gui.DeleteObject(bitmap.GetHandle())
+    rgb = bytearray(width * height * 3)
+    rgb[0::3], rgb[1::3], rgb[2::3] = bgra[2::4], bgra[1::4], bgra[0::4]
+    return bytes(rgb)
+
+
+# UIStateClassifier Class:
+# Maps probe pixels to values through hashed templates.
+class UIStateClassifier(object):
+
+    def __init__(self, probes=None, templates=None):
+        """Constructor for the UIStateClassifier class.
+
+        Args:
+        - probes (dict, optional): Field name -> (x, y, width, height). Default is DEFAULT_PROBES.
+        - templates (dict, optional): Field name -> {hash: value}.
+        """
+        self.probes = dict(probes or DEFAULT_PROBES)
+        self.templates = dict((name, {}) for name in self.probes)
+        self.templates["street_view"] = {region_hash(_STREET_VIEW_WHITE): True}
+        for name, table in (templates or {}).items():
+            self.templates.setdefault(name, {}).update(table)
+
+    def capture(self, grab=grab_region, names=None):
+        """Capture probes one by one.
+
+        Args:
+        - grab (callable, optional): Called with (x, y, width, height), returns raw RGB bytes. Default is grab_region.
+        - names (iterable, optional): Probes to capture. Default is every probe with at least one template.
+
+        Returns:
+        - dict: Probe name -> raw RGB bytes.
+        """
+        if names is None:
+            names = [name for name in self.probes if self.templates.get(name)]
+        return dict((name, grab(self.probes[name])) for name in names)
+
+    def classify(self, pixels, timestamp=None):
+        """Classify captured probes.
+
+        Args:
+        - pixels (dict): Probe name -> raw RGB bytes, as returned by capture().
+
+        Returns:
+        - UIState: Matched values, None for probes without a matching template.
+        """
+        state = UIState(timestamp=timestamp)
+        for name, data in pixels.items():
+            table = self.templates.get(name)
+            if table:
+                setattr(state, name, table.get(region_hash(data)))
+        # Street View only has a template for the button being shown
+        if state.street_view is None:
+            state.street_view = False
+        return state
+
+    def learn(self, pixels, name, value):
+        """Store the captured pixels of a probe as the template for a value."""
+        self.templates.setdefault(name, {})[region_hash(pixels[name])] = value
+
+    def save(self, path=TEMPLATE_FILE):
+        with open(path, "w") as handle:
+            json.dump({"probes": self.probes, "templates": self.templates}, handle, indent=2, sort_keys=True)
+
+    @classmethod
+    def load(cls, path=TEMPLATE_FILE):
+        """Load probes and templates from a file, or use the defaults if it does not exist."""
+        if not os.path.exists(path):
+            return cls()
+        with open(path) as handle:
+            data = json.load(handle)
+        probes = dict((name, tuple(region)) for name, region in data.get("probes", {}).items())
+        return cls(probes or None, data.get("templates"))
+
+
+# UIStateService Class:
+# Runs the classifier on a background thread and publishes state changes.
+class UIStateService(object):
+
+    def __init__(self, classifier=None, interval=0.25, grab=grab_region):
+        """Constructor for the UIStateService class.
+
+        Args:
+        - classifier (UIStateClassifier, optional): Default loads TEMPLATE_FILE.
+        - interval (float, optional): Seconds between captures. Default is 0.25.
+        - grab (callable, optional): Called with (x, y, width, height) to capture raw RGB bytes. Default is grab_region.
+        """
+        self.classifier = classifier or UIStateClassifier.load()
+        self.interval = interval
+        self.grab = grab
+        self.state = UIState()
+        self.samples = 0
+        self._subscribers = []
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="UIStateService")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        if not self._running:
+            return
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._running
+
+    def subscribe(self, callback):
+        """Register callback(field, old_value, new_value), called from the service thread on every change."""
+        self._subscribers.append(callback)
+
+    def sample(self):
+        """Capture and classify once, publish the result and notify subscribers of changes."""
+        state = self.classifier.classify(self.classifier.capture(self.grab), _clock())
+        with self._cond:
+            previous, self.state = self.state, state
+            self.samples += 1
+            self._cond.notify_all()
+        old, new = previous.fields(), state.fields()
+        for name in new:
+            if old[name] != new[name]:
+                for callback in self._subscribers:
+                    callback(name, old[name], new[name])
+        return state
+
+    def wait_for(self, field, value, timeout):
+        """Block until a field reaches a value or the timeout expires.
+
+        Returns:
+        - bool: True if the UI confirmed the value in time.
+        """
+        deadline = _clock() + timeout
+        with self._cond:
+            while getattr(self.state, field) != value:
+                remaining = deadline - _clock()
+                if remaining <= 0 or not self._running:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def _run(self):
+        while self._running:
+            try:
+                self.sample()
+            except Exception:
+                pass  # Screen capture can fail briefly, e.g. on a locked screen; keep the last state
+            with self._cond:
+                if self._running:
+                    self._cond.wait(self.interval)
+
+
+def main(argv):
+    if len(argv) == 4 and argv[1] == "learn":
+        name, value = argv[2], argv[3]
+        if value in ("True", "False"):
+            value = value == "True"
+        classifier = UIStateClassifier.load()
+        classifier.learn(classifier.capture(names=[name]), name, value)
+        classifier.save()
+        print("Learned {} = {}".format(name, value))
+    else:
+        classifier = UIStateClassifier.load()
+        print(classifier.classify(classifier.capture()))
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,88 @@
+'''
+Zoom output channel.
+Behaviors compute a fractional zoom strength every frame. Sending each one as its own mouse wheel
+event floods the event queue, and the OS rounds the fractions, so zoom feels jerky. WheelAccumulator
+adds the fractions up across frames and sends whole notches instead, no more often than a set rate
+and no more than a few notches per event. The remainder carries over to the next frame, so the
+zoom speed stays proportional to the strength the behavior asked for.
+
+Behaviors pass the frame timestamp, so the rate limit runs on sensor time: a replayed session sends
+the same notches at any playback speed or CPU load. Without a timestamp the injected clock is used.
+'''
+
+import time
+
+import mouse
+
+_clock = getattr(time, "monotonic", time.time)
+
+
+# WheelAccumulator Class:
+# Turns a stream of fractional wheel deltas into rate-limited whole-notch wheel events.
+class WheelAccumulator(object):
+
+    def __init__(self, max_rate=20.0, max_notches=4, max_backlog=8.0, wheel=None, clock=_clock):
+        """Constructor for the WheelAccumulator class.
+
+        Args:
+        - max_rate (float, optional): Most wheel events sent per second. Default is 20.
+        - max_notches (int, optional): Most notches sent in one event. Default is 4.
+        - max_backlog (float, optional): Most notches kept waiting, so zooming stops soon after the hand does. Default is 8.
+        - wheel (callable, optional): Called with a whole number of notches. Default is mouse.wheel.
+        - clock (callable, optional): Monotonic time source, used when add() or flush() get no timestamp.
+        """
+        self.interval = 1.0 / max_rate
+        self.max_notches = max_notches
+        self.max_backlog = max_backlog
+        self._wheel = wheel or (lambda notches: mouse.wheel(delta=notches))
+        self.clock = clock
+        self.remainder = 0.0
+        self._next_event = 0.0
+        self.deltas = 0     # Fractional deltas received
+        self.events = 0     # Wheel events sent
+        self.notches = 0    # Notches sent, in either direction
+
+    def add(self, delta, timestamp=None):
+        """Add one frame's zoom strength and send whole notches if the rate allows.
+
+        Args:
+        - delta (float): Wheel delta in notches, positive zooms in.
+        - timestamp (int, optional): Frame timestamp in microseconds. Default is the clock.
+
+        Returns:
+        - int: Notches sent by this call.
+        """
+        if not delta:
+            return self.flush(timestamp)
+        self.deltas += 1
+        # A change of direction drops what was left over from the other direction
+        if (delta > 0) != (self.remainder > 0) and self.remainder:
+            self.remainder = 0.0
+        self.remainder = max(-self.max_backlog, min(self.max_backlog, self.remainder + delta))
+        return self.flush(timestamp)
+
+    def flush(self, timestamp=None):
+        """Send the whole notches collected so far if the rate allows.
+
+        Args:
+        - timestamp (int, optional): Frame timestamp in microseconds. Default is the clock.
+        """
+        notches = int(self.remainder)  # Rounds towards zero, the fraction stays behind
+        if not notches:
+            return 0
+        now = self.clock() if timestamp is None else timestamp * 1e-6
+        if now < self._next_event - self.interval:
+            self._next_event = now  # The time source went backwards, e.g. a new recording or a service restart
+        if now < self._next_event:
+            return 0
+        notches = max(-self.max_notches, min(self.max_notches, notches))
+        self.remainder -= notches
+        self._next_event = now + self.interval
+        self._wheel(notches)
+        self.events += 1
+        self.notches += abs(notches)
+        return notches
+
+    def reset(self):
+        """Forget the remainder, e.g. when the hand leaves."""
+        self.remainder = 0.0
@@ -0,0 +1,121 @@
+'''
+Direction zones for the hand slide behavior.
+A single dead zone threshold makes a palm resting near its edge flip an arrow key on and off many
+times per second, and every flip is an OS key event. ZoneDiscretizer turns the palm position into
+a direction per axis (-1, 0 or 1) with two thresholds: a direction is entered only beyond `enter`
+millimeters and kept until the palm comes back inside `exit`. A change must also be asked for
+during `dwell` seconds of frame time in a row before it is taken, which absorbs single-frame spikes.
+Dwell is measured on the frame timestamps, so a replay gives the same directions at any speed.
+
+With polar zoning the palm offset picks one of 8 directions by its angle, so diagonals hold two
+keys and a direction is kept until the angle leaves its sector by more than `sector_margin` degrees.
+
+A plain fixed-threshold discretizer runs alongside for comparison, so the number of key events
+the hysteresis and dwell saved can be reported.
+'''
+
+import math
+
+# Direction per axis for each polar sector, counterclockwise from +x
+_SECTORS = [(1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1)]
+
+
+def _key_events(before, after):
+    """Key events needed to go from one axis direction to another: one per key released or pressed."""
+    return abs(after - before)
+
+
+# ZoneDiscretizer Class:
+# Maps a palm offset to per-axis directions with hysteresis and dwell time.
+class ZoneDiscretizer(object):
+
+    def __init__(self, enter=25.0, exit=15.0, dwell=0.08, polar=False, sector_margin=10.0, dead_zone=20.0):
+        """Constructor for the ZoneDiscretizer class.
+
+        Args:
+        - enter (float, optional): Offset in millimeters beyond which a direction is entered. Default is 25.
+        - exit (float, optional): Offset in millimeters inside which a direction is left. Default is 15.
+        - dwell (float, optional): Seconds of frame time a change must be asked for before it is taken. Default is 0.08.
+        - polar (bool, optional): Use 8 direction sectors instead of independent axes. Default is False.
+        - sector_margin (float, optional): Degrees past the sector edge before polar zoning changes direction. Default is 10.
+        - dead_zone (float, optional): Threshold of the plain discretizer used for comparison. Default is 20.
+        """
+        if exit > enter:
+            raise ValueError("The exit threshold must not be larger than the enter threshold.")
+        self.enter = enter
+        self.exit = exit
+        self.dwell = int(dwell * 1e6)
+        self.polar = polar
+        self.sector_margin = sector_margin
+        self.dead_zone = dead_zone
+        self.state = [0, 0]          # Committed direction per axis
+        self._pending = [None, None]  # Direction asked for per axis and since when
+        self._plain = [0, 0]
+        self.key_events = 0          # Key events caused by the committed directions
+        self.plain_key_events = 0    # Key events a fixed dead zone without dwell would have caused
+
+    def update(self, x, z, timestamp):
+        """Discretize one palm offset.
+
+        Args:
+        - x (float): Left/right offset from the center in millimeters.
+        - z (float): Forward/backward offset from the center in millimeters.
+        - timestamp (int): Frame timestamp in microseconds.
+
+        Returns:
+        - (int, int): Direction of each axis, -1, 0 or 1.
+        """
+        wanted = self._sector(x, z) if self.polar else (self._axis(0, x), self._axis(1, z))
+        for axis, value in enumerate((x, z)):
+            plain = 0 if abs(value) <= self.dead_zone else (1 if value > 0 else -1)
+            self.plain_key_events += _key_events(self._plain[axis], plain)
+            self._plain[axis] = plain
+            self._settle(axis, wanted[axis], timestamp)
+        return tuple(self.state)
+
+    def reset(self):
+        """Go back to the center at once, e.g. when the hand leaves or goes out of range."""
+        for axis in (0, 1):
+            self.key_events += _key_events(self.state[axis], 0)
+            self.plain_key_events += _key_events(self._plain[axis], 0)
+        self.state = [0, 0]
+        self._plain = [0, 0]
+        self._pending = [None, None]
+
+    @property
+    def prevented(self):
+        """Key events avoided compared to a fixed dead zone without dwell time."""
+        return max(0, self.plain_key_events - self.key_events)
+
+    def _settle(self, axis, wanted, now):
+        if wanted == self.state[axis]:
+            self._pending[axis] = None
+            return
+        pending = self._pending[axis]
+        if pending is None or pending[0] != wanted or now < pending[1]:
+            self._pending[axis] = pending = (wanted, now)
+        if now - pending[1] >= self.dwell:
+            self.key_events += _key_events(self.state[axis], wanted)
+            self.state[axis] = wanted
+            self._pending[axis] = None
+
+    def _axis(self, axis, value):
+        current = self.state[axis]
+        if current and value * current > self.exit:
+            return current  # Still on the same side, outside the exit threshold
+        if abs(value) > self.enter:
+            return 1 if value > 0 else -1
+        return 0
+
+    def _sector(self, x, z):
+        current = tuple(self.state)
+        active = current != (0, 0)
+        if math.hypot(x, z) <= (self.exit if active else self.enter):
+            return (0, 0)
+        angle = math.degrees(math.atan2(z, x)) % 360.0
+        width = 360.0 / len(_SECTORS)
+        if active:
+            offset = (angle - _SECTORS.index(current) * width + 180.0) % 360.0 - 180.0
+            if abs(offset) <= width / 2 + self.sector_margin:
+                return current
+        return _SECTORS[int(round(angle / width)) % len(_SECTORS)]